@@ -6,8 +6,41 @@ Constantes y configuraciones predefinidas para la aplicación.
 Este archivo contiene las configuraciones para las diferentes plantas.
 """
 
+import sys
+from functools import cache
+from types import MappingProxyType
+
+
+def _freeze(obj):
+    """Convierte recursivamente dicts en MappingProxyType y listas en tuplas.
+    
+    Las cadenas (IDs de CT, circuitos, plantas) se internan para que todas las
+    referencias compartan el mismo objeto y las búsquedas en dicts comparen
+    por identidad.
+    """
+    if isinstance(obj, MappingProxyType):
+        return obj
+    if isinstance(obj, dict):
+        return MappingProxyType({_freeze(k): _freeze(v) for k, v in obj.items()})
+    if isinstance(obj, (list, tuple)):
+        return tuple(_freeze(v) for v in obj)
+    if isinstance(obj, str):
+        return sys.intern(obj)
+    return obj
+
+
+def _thaw(obj):
+    """Devuelve una copia mutable (dicts y listas) de una estructura congelada."""
+    if isinstance(obj, (dict, MappingProxyType)):
+        return {k: _thaw(v) for k, v in obj.items()}
+    if isinstance(obj, tuple):
+        return [_thaw(v) for v in obj]
+    return obj
+
+
 # Definición de las configuraciones predefinidas para plantas
-DEFAULT_CIRCUITOS = {
+# Todas las constantes son de solo lectura (MappingProxyType / tuplas)
+DEFAULT_CIRCUITOS = _freeze({
     'C1': ['CT21', 'CT22'],
     'C2': ['CT12', 'CT19', 'CT20'],
     'C3': ['CT16', 'CT17', 'CT18'],
@@ -16,29 +49,35 @@ DEFAULT_CIRCUITOS = {
     'C6': ['CT04', 'CT05', 'CT06'],
     'C7': ['CT01', 'CT02', 'CT03'],
     'C8': ['CT09', 'CT08'],
-}
-DEFAULT_RING_ORDER = ['C1', 'C2', 'C3', 'C4', 'C5', 'C6', 'C7', 'C8']
+})
+DEFAULT_RING_ORDER = ('C1', 'C2', 'C3', 'C4', 'C5', 'C6', 'C7', 'C8')
+
+# Índice inverso CT -> circuito, calculado una sola vez
+CT_TO_CIRCUITO = MappingProxyType({
+    ct: circuito for circuito, cts in DEFAULT_CIRCUITOS.items() for ct in cts
+})
 
 # Configuraciones para fibras
-DEFAULT_FIBRAS_COMMS_IDA = [1, 2]
-DEFAULT_FIBRAS_COMMS_VUELTA = [3, 4]
-DEFAULT_FIBRAS_RESERVA = list(range(5, 13))
-DEFAULT_FIBRAS_CCTV = list(range(13, 17))
+DEFAULT_FIBRAS_COMMS_IDA = (1, 2)
+DEFAULT_FIBRAS_COMMS_VUELTA = (3, 4)
+DEFAULT_FIBRAS_RESERVA = tuple(range(5, 13))
+DEFAULT_FIBRAS_CCTV = tuple(range(13, 17))
 DEFAULT_TOTAL_FIBRAS = 16
+DEFAULT_FIBRAS = _freeze({
+    "comms_ida": DEFAULT_FIBRAS_COMMS_IDA,
+    "comms_vuelta": DEFAULT_FIBRAS_COMMS_VUELTA,
+    "reserva": DEFAULT_FIBRAS_RESERVA,
+    "cctv": DEFAULT_FIBRAS_CCTV,
+    "total": DEFAULT_TOTAL_FIBRAS
+})
 
 # Configuraciones predefinidas para las plantas
-PLANT_CONFIGS = {
+PLANT_CONFIGS = _freeze({
     # Sabinar I - Configuración completa 22 CTs
     "Sabinar I": {
         "circuitos": DEFAULT_CIRCUITOS,
         "ring_order": DEFAULT_RING_ORDER,
-        "fibras": {
-            "comms_ida": DEFAULT_FIBRAS_COMMS_IDA,
-            "comms_vuelta": DEFAULT_FIBRAS_COMMS_VUELTA,
-            "reserva": DEFAULT_FIBRAS_RESERVA,
-            "cctv": DEFAULT_FIBRAS_CCTV,
-            "total": DEFAULT_TOTAL_FIBRAS
-        },
+        "fibras": DEFAULT_FIBRAS,
         "gps_positions": {  # Posiciones GPS simuladas para Sabinar I
             "SET": (39.5000, -2.0000),
             "CT01": (39.4950, -2.0050),
@@ -65,10 +104,10 @@ PLANT_CONFIGS = {
             "CT22": (39.5250, -2.0550),
         }
     }
-}
+})
 
 # Configuraciones CCTV predefinidas para plantas
-CCTV_CONFIGS = {
+CCTV_CONFIGS = _freeze({
     "Sabinar I": {
         "CT01": {"camaras": 2, "baculos": ["B01", "B02"]},
         "CT05": {"camaras": 1, "baculos": ["B03"]},
@@ -76,8 +115,18 @@ CCTV_CONFIGS = {
         "CT15": {"camaras": 2, "baculos": ["B07", "B08"]},
         "CT20": {"camaras": 1, "baculos": ["B09"]}
     }
-}
+})
 
+# Configuración usada para plantas sin configuración predefinida (instancia única,
+# comparte circuitos, orden y fibras con las constantes por defecto)
+_DEFAULT_PLANT_CONFIG = _freeze({
+    "circuitos": DEFAULT_CIRCUITOS,
+    "ring_order": DEFAULT_RING_ORDER,
+    "fibras": DEFAULT_FIBRAS,
+    "gps_positions": {}
+})
+
+@cache
 def get_plant_config(plant_id):
     """Obtiene la configuración para una planta específica.
     
@@ -85,25 +134,26 @@ def get_plant_config(plant_id):
         plant_id (str): ID de la planta
         
     Returns:
-        dict: Configuración de la planta o configuración por defecto
+        Mapping: Configuración (de solo lectura) de la planta o configuración por defecto
     """
-    # Si existe configuración predefinida, devolverla
-    if plant_id in PLANT_CONFIGS:
-        return PLANT_CONFIGS[plant_id]
+    # Configuración predefinida o, si no existe, la configuración por defecto
+    return PLANT_CONFIGS.get(plant_id, _DEFAULT_PLANT_CONFIG)
+
+def get_circuito_for_ct(ct_id):
+    """Obtiene el circuito al que pertenece un CT.
     
-    # Si no, devolver configuración por defecto
-    return {
-        "circuitos": DEFAULT_CIRCUITOS,
-        "ring_order": DEFAULT_RING_ORDER,
-        "fibras": {
-            "comms_ida": DEFAULT_FIBRAS_COMMS_IDA,
-            "comms_vuelta": DEFAULT_FIBRAS_COMMS_VUELTA,
-            "reserva": DEFAULT_FIBRAS_RESERVA,
-            "cctv": DEFAULT_FIBRAS_CCTV,
-            "total": DEFAULT_TOTAL_FIBRAS
-        },
-        "gps_positions": {}
-    }
+    Args:
+        ct_id (str): ID del CT
+        
+    Returns:
+        str: ID del circuito o None si el CT no pertenece a ningún circuito
+    """
+    return CT_TO_CIRCUITO.get(ct_id)
+
+@cache
+def _get_cctv_source(plant_id):
+    """Devuelve la configuración CCTV canónica (compartida) de una planta."""
+    return CCTV_CONFIGS.get(plant_id, MappingProxyType({}))
 
 def get_cctv_config(plant_id):
     """Obtiene la configuración CCTV para una planta específica.
@@ -114,8 +164,30 @@ def get_cctv_config(plant_id):
     Returns:
         dict: Configuración CCTV de la planta o diccionario vacío
     """
-    if plant_id in CCTV_CONFIGS:
-        return CCTV_CONFIGS[plant_id].copy()
+    # La vista CCTV edita el resultado, así que se devuelve una copia mutable
+    return _thaw(_get_cctv_source(plant_id))
+
+@cache
+def get_gps_arrays(plant_id):
+    """Obtiene las posiciones GPS de una planta como arrays paralelos de NumPy.
+    
+    Permite cálculos vectorizados (distancias, vecino más cercano) sobre todos
+    los nodos sin recorrer el diccionario de posiciones en Python.
+    
+    Args:
+        plant_id (str): ID de la planta
+        
+    Returns:
+        tuple: (nombres, latitudes, longitudes); nombres es una tupla de IDs de
+        nodo y latitudes/longitudes son arrays float64 de solo lectura
+    """
+    import numpy as np  # Importación diferida: solo se necesita para cálculos GPS
     
-    # Si no hay configuración predefinida, devolver vacío
-    return {}
+    gps_positions = get_plant_config(plant_id).get("gps_positions", {})
+    names = tuple(gps_positions)
+    lat = np.fromiter((gps_positions[n][0] for n in names), dtype=np.float64, count=len(names))
+    lon = np.fromiter((gps_positions[n][1] for n in names), dtype=np.float64, count=len(names))
+    # Los arrays se comparten entre llamadas (caché): impedir su modificación
+    lat.setflags(write=False)
+    lon.setflags(write=False)
+    return names, lat, lon
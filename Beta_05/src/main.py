@@ -3,8 +3,12 @@
 
 import sys
 import logging
+import logging.handlers
+import queue
+import atexit
+import threading
 import os
-import importlib.util
+from importlib.metadata import distributions
 import subprocess
 from pathlib import Path
 
@@ -15,49 +19,56 @@ if str(current_dir) not in sys.path:
 
 def check_and_install_dependencies():
     """Verifica e instala las dependencias necesarias si faltan."""
-    # Listado de paquetes esenciales para la aplicación
+    # Listado de paquetes esenciales para la aplicación.
+    # Los opcionales (PyQt6-WebEngine, folium, matplotlib) se comprueban de forma
+    # diferida en las vistas que los usan; la vista GPS ofrece instalarlos.
     required_packages = {
         'PyQt6': 'PyQt6>=6.0.0',
-        'PyQt6-WebEngine': 'PyQt6-WebEngine>=6.0.0',  # Añadido para soporte de WebEngineWidgets
         'networkx': 'networkx>=2.6.0',
-        'matplotlib': 'matplotlib>=3.4.0',
         'numpy': 'numpy>=1.20.0',
         'pandas': 'pandas>=1.3.0',
         'sqlalchemy': 'sqlalchemy>=1.4.0',
         'pillow': 'pillow>=8.0.0',
-        'folium': 'folium>=0.12.0'  # Añadido para mapas
+    }
+    
+    # Obtener de una sola pasada los nombres de las distribuciones instaladas
+    # (normalizados) en lugar de recorrer sys.path una vez por paquete
+    installed = {
+        dist.metadata["Name"].lower().replace('_', '-')
+        for dist in distributions()
+        if dist.metadata["Name"]
     }
     
     missing_packages = []
     
     # Comprobar cada paquete
     for package_name, install_spec in required_packages.items():
-        if importlib.util.find_spec(package_name) is None:
+        if package_name.lower() not in installed:
             missing_packages.append(install_spec)
     
     # Si faltan paquetes, instalarlos
     if missing_packages:
-        print("Faltan dependencias necesarias. Instalando...")
-        for pkg in missing_packages:
-            print(f"Instalando {pkg}...")
-            try:
-                subprocess.check_call([sys.executable, "-m", "pip", "install", pkg])
-                print(f"✓ {pkg} instalado correctamente")
-            except subprocess.CalledProcessError:
-                print(f"✗ Error al instalar {pkg}. Por favor instálelo manualmente.")
-                sys.exit(1)
+        print(f"Faltan dependencias necesarias. Instalando {', '.join(missing_packages)}...")
+        # Una sola invocación de pip: un único arranque y una única resolución
+        try:
+            subprocess.check_call([sys.executable, "-m", "pip", "install", *missing_packages])
+        except subprocess.CalledProcessError:
+            print("✗ Error al instalar las dependencias. Por favor instálelas manualmente.")
+            sys.exit(1)
         print("Todas las dependencias han sido instaladas.")
     return True
 
-# Verificar dependencias antes de cualquier otra operación
-check_and_install_dependencies()
+# Verificar dependencias antes de cualquier otra operación, solo al ejecutar la
+# aplicación (no al importar el módulo). FIBER_SKIP_DEP_CHECK=1 omite la comprobación.
+if __name__ == "__main__" and os.environ.get("FIBER_SKIP_DEP_CHECK") != "1":
+    check_and_install_dependencies()
 
 # Configuración específica según sistema operativo
 # Importante: Para Windows NO configurar QT_QPA_PLATFORM
-if sys.platform == "win32":
+IS_WIN = sys.platform == "win32"
+if IS_WIN:
     # En Windows, eliminamos cualquier configuración de plataforma para usar la nativa
-    if "QT_QPA_PLATFORM" in os.environ:
-        del os.environ["QT_QPA_PLATFORM"]
+    os.environ.pop("QT_QPA_PLATFORM", None)
     
     # Para depuración
     print("Ejecutando en Windows - usando plataforma Qt nativa")
@@ -80,31 +91,58 @@ from ui.main_window import MainWindow
 from model.network_model import NetworkModel
 from model.storage import ConfigStorage
 
-# Crear directorio de configuración antes de configurar logging
-app_dir = os.path.dirname(os.path.abspath(__file__))
-log_path = os.path.join(app_dir, '..', 'fiber_hybrid.log')
-config_dir = os.path.join(app_dir, '..', 'config')
-os.makedirs(config_dir, exist_ok=True)
+# Rutas de la aplicación (el directorio de configuración y el log se crean en main())
+APP_DIR = Path(__file__).resolve().parent
+LOG_PATH = APP_DIR.parent / 'fiber_hybrid.log'
+CONFIG_DIR = APP_DIR.parent / 'config'
 
-# Configuración de logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.StreamHandler(),
-        logging.FileHandler(log_path, mode='w')
-    ]
-)
+def setup_logging():
+    """Configura el logging de la aplicación.
+    
+    El hilo de Qt solo encola registros y un QueueListener en segundo plano
+    realiza la escritura en consola y fichero. Se invoca desde main() para que
+    importar este módulo no trunque el fichero de log.
+    
+    Returns:
+        QueueListener: Listener ya iniciado (se detiene al salir)
+    """
+    log_formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    stream_handler = logging.StreamHandler()
+    stream_handler.setFormatter(log_formatter)
+    file_handler = logging.FileHandler(LOG_PATH, mode='w')
+    file_handler.setFormatter(log_formatter)
+    
+    log_queue = queue.SimpleQueue()
+    log_listener = logging.handlers.QueueListener(
+        log_queue, stream_handler, file_handler, respect_handler_level=True
+    )
+    log_listener.start()
+    atexit.register(log_listener.stop)
+    
+    # El formato completo lo aplican los handlers del listener
+    queue_handler = logging.handlers.QueueHandler(log_queue)
+    queue_handler.setFormatter(logging.Formatter('%(message)s'))
+    
+    # force=True: los avisos emitidos durante las importaciones (p.ej. dependencias
+    # opcionales ausentes) ya pueden haber configurado el logger raíz.
+    logging.basicConfig(
+        level=logging.INFO,
+        handlers=[queue_handler],
+        force=True
+    )
+    return log_listener
 
 logger = logging.getLogger(__name__)
 
-def main():
-    """Función principal que inicia la aplicación."""
+def _init_model(result):
+    """Crea el almacenamiento y el modelo de red (ejecutado en un hilo auxiliar).
+    
+    Args:
+        result (dict): Diccionario donde se deja 'model' o, si falla, 'error'
+    """
     try:
-        # Crear directorio de configuración si no existe (ya se asegura arriba)
-        # Inicializar el modelo
-        db_path = os.path.join(config_dir, 'network_config.db')
-        storage = ConfigStorage(db_path)
+        db_path = CONFIG_DIR / 'network_config.db'
+        storage = ConfigStorage(str(db_path))
         # Forzar planta inicial a 'Sabinar I' para evitar problemas de arranque
         model = NetworkModel(storage)
         try:
@@ -112,12 +150,35 @@ def main():
             logger.info("Planta inicial establecida a 'Sabinar I'")
         except Exception as e:
             logger.error(f"No se pudo establecer 'Sabinar I' como planta inicial: {e}")
+        result["model"] = model
+    except Exception as e:
+        result["error"] = e
+
+def main():
+    """Función principal que inicia la aplicación."""
+    setup_logging()
+    try:
+        # Crear directorio de configuración si no existe
+        CONFIG_DIR.mkdir(parents=True, exist_ok=True)
+        
+        # Inicializar el modelo en segundo plano (apertura de SQLite y activación
+        # de la planta) mientras Qt arranca y enumera sus plugins
+        init_result = {}
+        init_thread = threading.Thread(
+            target=_init_model, args=(init_result,), name="model-init", daemon=True
+        )
+        init_thread.start()
         
         # Inicializar la aplicación Qt
         app = QApplication(sys.argv)
         app.setApplicationName("Fiber Hybrid PON")
         app.setApplicationVersion("1.0")
         
+        init_thread.join()
+        if "error" in init_result:
+            raise init_result["error"]
+        model = init_result["model"]
+        
         # Crear y mostrar la ventana principal
         main_window = MainWindow(model)
         logger.info("Ventana principal creada")
@@ -126,7 +187,7 @@ def main():
         main_window.show()
         
         # Métodos adicionales solo para Windows
-        if sys.platform == "win32":
+        if IS_WIN:
             # Estos métodos pueden fallar en Linux, así que los protegemos
             try:
                 main_window.raise_()  # Traer al frente en Windows
@@ -2,67 +2,512 @@
 # -*- coding: utf-8 -*-
 
 import networkx as nx
+import numpy as np
 import logging
 import time
 import threading
-from typing import Dict, List, Tuple, Optional, Any, Set
+from typing import Dict, List, Tuple, Optional, Any, Set, NamedTuple, Mapping
 import json
-import os
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
+from functools import cache, partial
 from datetime import datetime
-import sys
+from types import MappingProxyType
 
-# Añadir directorio padre al path para importar constantes
-sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
-from constants import get_plant_config, DEFAULT_CIRCUITOS, DEFAULT_RING_ORDER
-from constants import DEFAULT_FIBRAS_COMMS_IDA, DEFAULT_FIBRAS_COMMS_VUELTA
-from constants import DEFAULT_FIBRAS_RESERVA, DEFAULT_FIBRAS_CCTV, DEFAULT_TOTAL_FIBRAS
+try:
+    from ..constants import get_plant_config, get_cctv_config, DEFAULT_CIRCUITOS, DEFAULT_RING_ORDER
+    from ..constants import DEFAULT_FIBRAS_COMMS_IDA, DEFAULT_FIBRAS_COMMS_VUELTA
+    from ..constants import DEFAULT_FIBRAS_RESERVA, DEFAULT_FIBRAS_CCTV, DEFAULT_TOTAL_FIBRAS
+except ImportError:
+    # La aplicación importa 'model' como paquete de primer nivel (src ya está en sys.path)
+    from constants import get_plant_config, get_cctv_config, DEFAULT_CIRCUITOS, DEFAULT_RING_ORDER
+    from constants import DEFAULT_FIBRAS_COMMS_IDA, DEFAULT_FIBRAS_COMMS_VUELTA
+    from constants import DEFAULT_FIBRAS_RESERVA, DEFAULT_FIBRAS_CCTV, DEFAULT_TOTAL_FIBRAS
+
+# Numba (opcional): compila la búsqueda de caminos sobre el grafo lógico en CSR.
+# Si no está instalado se usa la búsqueda en Python puro sobre listas de adyacencia.
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
 
 # Logger por defecto
 default_logger = logging.getLogger(__name__)
 
 CACHE_EXPIRATION_TIME = 10  # Segundos
+DENSE_REACH_MAX_NODES = 256  # Hasta este tamaño de DG se usa la matriz de alcanzabilidad
 
-def _has_path_limited(graph, source, target, max_depth=30):
-    """Búsqueda iterativa limitada para evitar recursión infinita."""
+def _bidir_reachable(succ, pred, source, target, max_depth=30):
+    """Comprueba si existe un camino dirigido source -> target mediante BFS bidireccional.
+    
+    Expande por capas alternativamente un frente hacia delante desde `source`
+    (sucesores) y otro hacia atrás desde `target` (predecesores), eligiendo
+    siempre el frente más pequeño, y termina en cuanto ambos se encuentran.
+    La suma de las profundidades de ambos frentes se limita a `max_depth`.
+    
+    Args:
+        succ: Adyacencia de sucesores {nodo: iterable de nodos}
+        pred: Adyacencia de predecesores {nodo: iterable de nodos}
+        source: Nodo origen
+        target: Nodo destino
+        max_depth: Longitud máxima del camino
+        
+    Returns:
+        bool: True si target es alcanzable desde source
+    """
     if source == target:
         return True
-    visited = set()
-    stack = [(source, 0)]
-    while stack:
-        node, depth = stack.pop()
-        if node == target:
-            return True
-        if depth >= max_depth:
-            continue
-        for neighbor in graph.successors(node):
-            if neighbor not in visited:
-                visited.add(neighbor)
-                stack.append((neighbor, depth + 1))
+    if source not in succ or target not in pred:
+        return False
+    visited_fwd = {source}
+    visited_bwd = {target}
+    frontier_fwd = [source]
+    frontier_bwd = [target]
+    depth = 0
+    while frontier_fwd and frontier_bwd and depth < max_depth:
+        depth += 1
+        if len(frontier_fwd) <= len(frontier_bwd):
+            frontier, visited, other, adjacency = frontier_fwd, visited_fwd, visited_bwd, succ
+        else:
+            frontier, visited, other, adjacency = frontier_bwd, visited_bwd, visited_fwd, pred
+        next_frontier = []
+        # Métodos ligados a variables locales: evita búsquedas de atributo por vecino
+        visit = visited.add
+        push = next_frontier.append
+        for node in frontier:
+            for neighbor in adjacency[node]:
+                if neighbor in other:
+                    return True
+                if neighbor not in visited:
+                    visit(neighbor)
+                    push(neighbor)
+        if frontier is frontier_fwd:
+            frontier_fwd = next_frontier
+        else:
+            frontier_bwd = next_frontier
     return False
 
-def _has_path_limited_iterative(graph, source, target, max_depth=30):
-    """Búsqueda iterativa en profundidad limitada para evitar recursión infinita."""
+def _bidir_reachable_csr(indptr_f, indices_f, indptr_b, indices_b, source, target, max_depth):
+    """BFS bidireccional sobre el grafo en formato CSR con nodos indexados por enteros.
+    
+    Misma lógica que _bidir_reachable, escrita solo con arrays de NumPy para que
+    Numba pueda compilarla.
+    
+    Args:
+        indptr_f, indices_f: CSR de sucesores
+        indptr_b, indices_b: CSR de predecesores
+        source: Índice del nodo origen
+        target: Índice del nodo destino
+        max_depth: Longitud máxima del camino
+        
+    Returns:
+        bool: True si target es alcanzable desde source
+    """
     if source == target:
         return True
-    visited = {source}
-    stack = [(source, 0)]
-    while stack:
-        node, depth = stack.pop()
-        if node == target:
-            return True
+    n = indptr_f.shape[0] - 1
+    mark = np.zeros(n, dtype=np.int8)  # 1: visitado hacia delante, 2: hacia atrás
+    frontier_fwd = np.empty(n, dtype=np.int32)
+    frontier_bwd = np.empty(n, dtype=np.int32)
+    next_frontier = np.empty(n, dtype=np.int32)
+    frontier_fwd[0] = source
+    frontier_bwd[0] = target
+    size_fwd = 1
+    size_bwd = 1
+    mark[source] = 1
+    mark[target] = 2
+    depth = 0
+    while size_fwd > 0 and size_bwd > 0 and depth < max_depth:
+        depth += 1
+        size_next = 0
+        if size_fwd <= size_bwd:
+            for i in range(size_fwd):
+                node = frontier_fwd[i]
+                for k in range(indptr_f[node], indptr_f[node + 1]):
+                    neighbor = indices_f[k]
+                    if mark[neighbor] == 2:
+                        return True
+                    if mark[neighbor] == 0:
+                        mark[neighbor] = 1
+                        next_frontier[size_next] = neighbor
+                        size_next += 1
+            frontier_fwd[:size_next] = next_frontier[:size_next]
+            size_fwd = size_next
+        else:
+            for i in range(size_bwd):
+                node = frontier_bwd[i]
+                for k in range(indptr_b[node], indptr_b[node + 1]):
+                    neighbor = indices_b[k]
+                    if mark[neighbor] == 1:
+                        return True
+                    if mark[neighbor] == 0:
+                        mark[neighbor] = 2
+                        next_frontier[size_next] = neighbor
+                        size_next += 1
+            frontier_bwd[:size_next] = next_frontier[:size_next]
+            size_bwd = size_next
+    return False
+
+def _build_csr(succ, pred):
+    """Codifica una adyacencia {nodo: [nodos]} como CSR con nodos indexados por enteros.
+    
+    Returns:
+        tuple: (node_ids, indptr_f, indices_f, indptr_b, indices_b)
+    """
+    node_ids = {node: i for i, node in enumerate(succ)}
+    
+    def _encode(adjacency):
+        indptr = np.zeros(len(node_ids) + 1, dtype=np.int32)
+        indices = []
+        for node, i in node_ids.items():
+            neighbors = adjacency.get(node, ())
+            indptr[i + 1] = indptr[i] + len(neighbors)
+            indices.extend(node_ids[nb] for nb in neighbors)
+        return indptr, np.asarray(indices, dtype=np.int32)
+    
+    indptr_f, indices_f = _encode(succ)
+    indptr_b, indices_b = _encode(pred)
+    return node_ids, indptr_f, indices_f, indptr_b, indices_b
+
+if NUMBA_AVAILABLE:
+    # Sin cache=True: el módulo se importa como 'model.network_model' (aplicación) y
+    # como 'src.model.network_model' (tests), y la caché en disco no es compartible
+    _bidir_reachable_csr = njit(boundscheck=False)(_bidir_reachable_csr)
+
+def _reachability_matrix(succ, max_depth=30):
+    """Calcula la matriz de alcanzabilidad acotada de un grafo dirigido pequeño.
+    
+    Parte de la matriz de adyacencia densa con la diagonal activa (caminos de
+    longitud <= 1) y la compone por duplicación: R(a) · R(b) = R(a + b). Así
+    se obtienen todos los pares con camino de longitud <= max_depth con unas
+    pocas multiplicaciones de matrices en lugar de una búsqueda por consulta.
+    
+    Args:
+        succ: Adyacencia de sucesores {nodo: lista de nodos}
+        max_depth: Longitud máxima del camino
+        
+    Returns:
+        tuple: (node_ids, reach) con node_ids {nodo: índice} y reach una matriz
+        bool NxN donde reach[i, j] indica camino i -> j
+    """
+    node_ids = {node: i for i, node in enumerate(succ)}
+    n = len(node_ids)
+    # float32: la multiplicación usa BLAS; los valores se normalizan a 0/1 tras cada paso
+    step = np.eye(n, dtype=np.float32)
+    for node, neighbors in succ.items():
+        i = node_ids[node]
+        for neighbor in neighbors:
+            step[i, node_ids[neighbor]] = 1.0
+    reach = None
+    remaining = max_depth
+    while remaining:
+        if remaining & 1:
+            reach = step if reach is None else ((reach @ step) > 0).astype(np.float32)
+        remaining >>= 1
+        if remaining:
+            step = ((step @ step) > 0).astype(np.float32)
+    if reach is None:
+        reach = np.eye(n, dtype=np.float32)
+    return node_ids, reach > 0
+
+@cache
+def _warmup_csr():
+    """Compila _bidir_reachable_csr con un grafo mínimo (0 -> 1), una vez por proceso.
+    
+    Se invoca al crear el modelo y no en la importación: la compilación tarda del
+    orden de segundos y en main() el modelo se crea en un hilo auxiliar.
+    """
+    _bidir_reachable_csr(
+        np.array([0, 1, 1], dtype=np.int32), np.array([1], dtype=np.int32),
+        np.array([0, 0, 1], dtype=np.int32), np.array([0], dtype=np.int32),
+        0, 1, 30
+    )
+
+class _AdjacencySnapshot:
+    """Instantánea de solo lectura de la adyacencia del grafo lógico dirigido."""
+    
+    __slots__ = ('succ', 'pred', 'patches', 'csr', 'dense', '_reach', '_set_reach')
+    
+    def __init__(self, DG):
+        # Listas planas de vecinos: las búsquedas recorren listas en lugar
+        # de crear vistas/iteradores de NetworkX en cada nodo visitado
+        self.succ = {n: list(nbrs) for n, nbrs in DG._succ.items()}
+        self.pred = {n: list(nbrs) for n, nbrs in DG._pred.items()}
+        # Parches de SET que no coinciden con una arista IDA/VUELTA
+        self.patches = {(a, b) for a, b, edge_type in DG.edges(data='type') if edge_type == 'set_patch'}
+        # Grafos pequeños (plantas típicas): matriz de alcanzabilidad; grafos
+        # grandes: BFS (compilado si hay Numba). Ambas se calculan en la primera consulta
+        self.dense = len(self.succ) <= DENSE_REACH_MAX_NODES
+        self.csr = None
+        self._reach = {}  # max_depth -> (node_ids, matriz de alcanzabilidad)
+        self._set_reach = None
+    
+    def copy(self):
+        """Copia para modificar sin afectar a los lectores de esta instantánea.
+        
+        Comparte las listas de vecinos (add_edge/remove_edge las sustituyen,
+        nunca las modifican); las estructuras derivadas se recalculan al consultarla.
+        """
+        clone = _AdjacencySnapshot.__new__(_AdjacencySnapshot)
+        clone.succ = dict(self.succ)
+        clone.pred = dict(self.pred)
+        clone.patches = set(self.patches)
+        clone.dense = self.dense
+        clone.csr = None
+        clone._reach = {}
+        clone._set_reach = None
+        return clone
+    
+    def has_edge(self, a, b):
+        return b in self.succ.get(a, ())
+    
+    def add_edge(self, a, b):
+        """Añade la arista a -> b (si era un parche de SET pasa a ser una arista propia)."""
+        self.patches.discard((a, b))
+        if not self.has_edge(a, b):
+            self.succ[a] = [*self.succ[a], b]
+            self.pred[b] = [*self.pred[b], a]
+    
+    def remove_edge(self, a, b):
+        self.succ[a] = [n for n in self.succ[a] if n != b]
+        self.pred[b] = [n for n in self.pred[b] if n != a]
+    
+    def add_patch(self, a, b):
+        """Añade un parche de SET a -> b (solo se añaden entre nodos sin camino)."""
+        self.add_edge(a, b)
+        self.patches.add((a, b))
+    
+    def remove_patches(self):
+        for a, b in self.patches:
+            self.remove_edge(a, b)
+        self.patches = set()
+    
+    def set_reachability(self):
+        """Distancias desde y hacia SET (calculadas una vez por instantánea).
+        
+        Returns:
+            tuple: (alcanzables_desde_SET, que_alcanzan_SET) como dicts {nodo: saltos}
+        """
+        if self._set_reach is None:
+            self._set_reach = _compute_set_reachability(self.succ, self.pred, 'SET', max_depth=30)
+        return self._set_reach
+    
+    def __contains__(self, node):
+        return node in self.succ
+    
+    def has_path(self, source, target, max_depth=30):
+        """Comprueba si existe un camino dirigido source -> target.
+        
+        Con grafos pequeños consulta la matriz de alcanzabilidad (O(1) tras
+        calcularla); en otro caso usa BFS bidireccional (compilado si hay Numba).
+        """
+        if self.dense and source != target:
+            if max_depth not in self._reach:
+                self._reach[max_depth] = _reachability_matrix(self.succ, max_depth)
+            node_ids, reach = self._reach[max_depth]
+            s = node_ids.get(source)
+            t = node_ids.get(target)
+            if s is None or t is None:
+                return False
+            return bool(reach[s, t])
+        if not NUMBA_AVAILABLE or source == target:
+            return _bidir_reachable(self.succ, self.pred, source, target, max_depth)
+        if self.csr is None:
+            self.csr = _build_csr(self.succ, self.pred)
+        node_ids, indptr_f, indices_f, indptr_b, indices_b = self.csr
+        s = node_ids.get(source)
+        t = node_ids.get(target)
+        if s is None or t is None:
+            return False
+        return bool(_bidir_reachable_csr(indptr_f, indices_f, indptr_b, indices_b, s, t, max_depth))
+
+def _compute_set_reachability(succ, pred, source='SET', max_depth=30):
+    """Calcula en una sola pasada los nodos alcanzables desde y hacia un origen.
+    
+    Ejecuta un BFS hacia delante (sucesores) y otro hacia atrás (predecesores)
+    desde `source`, de modo que la conectividad bidireccional de todos los CTs
+    se resuelve en O(V+E) en lugar de dos búsquedas por CT. Las distancias
+    permiten además acotar caminos que pasan por `source` (ver _path_via_source).
+    
+    Args:
+        succ: Adyacencia de sucesores {nodo: iterable de nodos}
+        pred: Adyacencia de predecesores {nodo: iterable de nodos}
+        source: Nodo origen (por defecto 'SET')
+        max_depth: Profundidad máxima de búsqueda
+        
+    Returns:
+        tuple: (alcanzables_desde_source, que_alcanzan_source) como dicts
+        {nodo: distancia en saltos}
+    """
+    if source not in succ:
+        return {}, {}
+    return _bfs_distances(succ, source, max_depth), _bfs_distances(pred, source, max_depth)
+
+def _bfs_distances(adjacency, source, max_depth=30):
+    """Distancias en saltos (hasta max_depth) desde source siguiendo `adjacency`."""
+    reached = {source: 0}
+    queue = deque([(source, 0)])
+    while queue:
+        node, depth = queue.popleft()
         if depth >= max_depth:
             continue
-        try:
-            neighbors = list(graph.successors(node))
-            for neighbor in neighbors:
-                if neighbor not in visited:
-                    visited.add(neighbor)
-                    stack.append((neighbor, depth + 1))
-        except Exception as e:
-            default_logger.error(f"Error obteniendo sucesores para {node} en _has_path_limited_iterative: {e}")
-            return False
+        for neighbor in adjacency[node]:
+            if neighbor not in reached:
+                reached[neighbor] = depth + 1
+                queue.append((neighbor, depth + 1))
+    return reached
+
+def _edge_on_ring_path(succ, pred, a, b, ring_pairs, max_depth=30):
+    """Indica si la arista a -> b puede estar en un camino acotado entre un par del anillo.
+    
+    Si no lo está, añadirla o quitarla no cambia la alcanzabilidad de ningún
+    par (nodo_final, nodo_inicial) y los parches de SET siguen siendo válidos.
+    """
+    to_a = _bfs_distances(pred, a, max_depth)
+    from_b = _bfs_distances(succ, b, max_depth)
+    for nodo_final, nodo_inicial, _, _ in ring_pairs:
+        depth_final = to_a.get(nodo_final)
+        depth_inicial = from_b.get(nodo_inicial)
+        if (depth_final is not None and depth_inicial is not None and
+                depth_final + 1 + depth_inicial <= max_depth):
+            return True
     return False
 
+def _path_via_source(reach_from, reach_to, origin, destination, max_depth=30):
+    """Comprueba si existe un camino origin -> source -> destination de longitud acotada.
+    
+    Condición suficiente (no necesaria) de alcanzabilidad calculada en O(1) a partir
+    de las distancias de _compute_set_reachability.
+    """
+    to_source = reach_to.get(origin)
+    from_source = reach_from.get(destination)
+    return (to_source is not None and from_source is not None and
+            to_source + from_source <= max_depth)
+
+# Estado de las fibras: matriz uint8 (un segmento por fila, índice de columna =
+# número de fibra - 1); cada enlace de G guarda en 'fibers' la vista de su fila
+FIBER_OK = 0
+FIBER_AVERIADO = 1
+_FIBER_ABSENT = 2  # Fibra inexistente: huecos de numeración y relleno hasta el ancho de la matriz
+_FIBER_STATUS_NAMES = ('ok', 'averiado')  # código -> estado
+
+def _fibers_from_status(fibers_status):
+    """Convierte el estado de fibras serializado al formato interno (bytearray).
+    
+    Las fibras que no figuran en el diccionario quedan ausentes (_FIBER_ABSENT),
+    de modo que una numeración con huecos se conserva al volver a guardarla.
+    Como en la lista de segmentos original, cualquier estado distinto de
+    'averiado' se normaliza a 'ok'.
+    
+    Args:
+        fibers_status: {número de fibra (str): 'ok' | 'averiado'} tal y como se
+            guarda en las configuraciones
+            
+    Returns:
+        bytearray: Un byte por fibra hasta la de mayor número (FIBER_OK /
+        FIBER_AVERIADO / _FIBER_ABSENT)
+    """
+    if isinstance(fibers_status, bytearray):
+        return fibers_status
+    if not isinstance(fibers_status, dict):
+        return bytearray(DEFAULT_TOTAL_FIBRAS)
+    numbers = {int(k): status for k, status in fibers_status.items()
+               if str(k).isdigit() and int(k) > 0}
+    fibers = bytearray([_FIBER_ABSENT]) * max(numbers, default=0)
+    for fiber_num, status in numbers.items():
+        fibers[fiber_num - 1] = FIBER_AVERIADO if status == 'averiado' else FIBER_OK
+    return fibers
+
+def _fibers_to_status(fibers):
+    """Convierte el estado interno (bytearray o fila de la matriz) en {número (str): estado}."""
+    return {str(i): _FIBER_STATUS_NAMES[code]
+            for i, code in enumerate(bytes(fibers), 1) if code != _FIBER_ABSENT}
+
+def _comm_status(fibers, comm_cols):
+    """Estado de comunicación de un segmento: 'faulty' si alguna fibra de
+    comunicación (columnas comm_cols de su fila en la matriz) está 'averiado'."""
+    return 'faulty' if (fibers[comm_cols[comm_cols < len(fibers)]] == FIBER_AVERIADO).any() else 'ok'
+
+def _fibers_to_mask(fiber_numbers):
+    """Máscara de bits (bit n-1 para la fibra n) de un conjunto de números de fibra."""
+    mask = 0
+    for fiber_num in fiber_numbers:
+        mask |= 1 << (int(fiber_num) - 1)
+    return mask
+
+def _fiber_ok_mask(fibers):
+    """Máscara de bits de las fibras en estado 'ok' de un segmento.
+    
+    Args:
+        fibers: Estado interno de las fibras del segmento (bytearray o fila de la matriz)
+        
+    Returns:
+        int: Máscara con el bit n-1 activo si la fibra n está 'ok'
+    """
+    return _fibers_to_mask(i for i, code in enumerate(bytes(fibers), 1) if code == FIBER_OK)
+
+# Contador de fibras 'ok' que corresponde a cada tipo de fibra (ver _PlantSettings.fiber_types)
+_FIBER_COUNTER_BY_TYPE = MappingProxyType({
+    "COMM-IDA": 'comm_ok', "COMM-VUELTA": 'comm_ok', "RESERVA": 'reserve_ok', "CCTV": 'cctv_ok',
+})
+
+def _iter_edges(G):
+    """Recorre los enlaces (u, v, data) de un nx.Graph directamente sobre su adyacencia.
+    
+    Mismo orden y resultado que G.edges(data=True), sin la maquinaria de vistas
+    de NetworkX (EdgeDataView) por cada enlace.
+    """
+    seen = set()
+    mark_seen = seen.add
+    for u, nbrs in G._adj.items():
+        for v, data in nbrs.items():
+            if v not in seen:
+                yield u, v, data
+        mark_seen(u)
+
+def _ring_pairs(circuitos, ring_order):
+    """Pares (último CT de un circuito, primero del siguiente) que cierran el anillo en SET.
+    
+    Returns:
+        tuple: (nodo_final, nodo_inicial, circuito, circuito siguiente) por par,
+        omitiendo los circuitos sin CTs
+    """
+    pairs = []
+    for i, circuit_actual in enumerate(ring_order):
+        circuit_siguiente = ring_order[(i + 1) % len(ring_order)]
+        cts_actual = circuitos.get(circuit_actual, [])
+        cts_siguiente = circuitos.get(circuit_siguiente, [])
+        if cts_actual and cts_siguiente:
+            pairs.append((cts_actual[-1], cts_siguiente[0], circuit_actual, circuit_siguiente))
+    return tuple(pairs)
+
+def _fiber_columns(fiber_numbers):
+    """Índices de columna de la matriz de fibras para unos números de fibra."""
+    return np.array([int(fn) - 1 for fn in fiber_numbers], dtype=np.intp)
+
+class _PlantSettings(NamedTuple):
+    """Valores de configuración de planta ya extraídos (con sus valores por defecto)."""
+    config: Mapping
+    circuitos: Mapping
+    ring_order: tuple
+    fibras_ida: tuple
+    fibras_vuelta: tuple
+    fibras_reserva: tuple
+    fibras_cctv: tuple
+    mask_ida: int
+    mask_vuelta: int
+    comm_keys: frozenset  # Claves (str) de las fibras de comunicación (ida y vuelta)
+    reserve_keys: frozenset
+    cctv_keys: frozenset
+    fiber_types: Mapping  # número de fibra -> etiqueta de tipo para informes
+    fiber_report_labels: Mapping  # clave de fibra (str) -> "  - F<n> (<tipo>)" del informe
+    comm_cols: np.ndarray  # Columnas de la matriz de fibras por tipo (sin solapamientos)
+    reserve_cols: np.ndarray
+    cctv_cols: np.ndarray
+    ring_pairs: tuple  # (nodo_final, nodo_inicial, circuito, circuito siguiente) del anillo
+
 class NetworkModel:
     """Modelo para la red de fibra óptica, con soporte para múltiples plantas."""
     
@@ -88,14 +533,34 @@ class NetworkModel:
             storage: Instancia de ConfigStorage para guardar/cargar configuraciones
         """
         self.G = nx.Graph()  # Grafo físico
-        self.graph_lock = threading.Lock()  # Lock para proteger G
+        self.graph_lock = threading.Lock()  # Lock de escritura de G y reconstrucción de DG
         self._DG_cache = None  # Caché del grafo lógico dirigido
+        self._DG_adj = None  # Instantánea de adyacencia de DG (_AdjacencySnapshot)
         self._cache_valid = False
         self._last_cache_time = 0
+        self._segment_index = {}  # ID de segmento ('u-v', 'v-u' o 'id') -> (u, v)
+        self._segments_cache = None  # Lista de segmentos de get_segment_data (None: por construir)
+        self._segments_by_edge = {}  # (u, v) -> dict del segmento en _segments_cache
+        self._fiber_matrix = np.empty((0, DEFAULT_TOTAL_FIBRAS), dtype=np.uint8)  # Fibras por segmento
+        self._edge_rows: Dict[Tuple[str, str], int] = {}  # (u, v) -> fila en _fiber_matrix
+        # (configuración de planta usada, {'comm_ok', 'reserve_ok', 'cctv_ok'}) de todo G;
+        # se mantiene por diferencias al cambiar fibras (None: por calcular)
+        self._fiber_counters: Optional[Tuple[_PlantSettings, Dict[str, int]]] = None
+        self._ct_list_cache: Tuple[str, ...] = ()  # CTs de G ordenados (se recalcula al cambiar nodos)
+        self._plant_config_cache: Dict[str, _PlantSettings] = {}  # planta -> configuración extraída
+        self._plants_cache: Optional[List[str]] = None  # Plantas del almacenamiento (None: por leer)
+        self._graph_dirty = True  # G tiene cambios no guardados en _synced_config
+        self.revision = 0  # Se incrementa con cada cambio de G (nodos, enlaces o fibras)
+        self._synced_config: Optional[Tuple[str, str]] = None  # (planta, nombre) igual a G
+        # Escrituras de save_configuration en segundo plano (un solo hilo: orden FIFO)
+        self._save_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='cfg-save')
         self.node_positions = {}  # Posiciones de los nodos
         self.storage = storage
         self.active_plant_id = "default"  # ID de la planta activa
         
+        if NUMBA_AVAILABLE:
+            _warmup_csr()
+        
         # Inicializar plantas predefinidas si no existen
         self._ensure_predefined_plants()
         # Inicializar con valores por defecto
@@ -105,7 +570,9 @@ class NetworkModel:
     def _init_graph(self, graph_data=None):
         """Inicializa el grafo con datos cargados o con valores por defecto."""
         with self.graph_lock:
-            default_logger.info(f"[INIT_GRAPH] INICIO para planta: {self.active_plant_id}")
+            default_logger.info("[INIT_GRAPH] INICIO para planta: %s", self.active_plant_id)
+            # Invalidar antes de vaciar G: los lectores sin bloqueo pasan a esperar el lock
+            self._cache_valid = False
             self.G.clear()
             
             if graph_data and isinstance(graph_data, dict):
@@ -115,12 +582,16 @@ class NetworkModel:
                 nodes = graph_data.get('nodes', [])
                 edges = graph_data.get('edges', [])
                 
+                # Los volcados completos de nodos/enlaces solo se formatean en DEBUG
+                debug_enabled = default_logger.isEnabledFor(logging.DEBUG)
                 for node in nodes:
-                    default_logger.debug(f"Añadiendo nodo: {node['id']} datos: {node}")
+                    if debug_enabled:
+                        default_logger.debug("Añadiendo nodo: %s datos: %s", node['id'], node)
                     self.G.add_node(node['id'], **{k: v for k, v in node.items() if k != 'id'})
                 
                 for edge in edges:
-                    default_logger.debug(f"Añadiendo enlace: {edge['source']}->{edge['target']} datos: {edge}")
+                    if debug_enabled:
+                        default_logger.debug("Añadiendo enlace: %s->%s datos: %s", edge['source'], edge['target'], edge)
                     self.G.add_edge(
                         edge['source'],
                         edge['target'],
@@ -131,12 +602,13 @@ class NetworkModel:
                 if 'node_positions' in graph_data:
                     self.node_positions = graph_data['node_positions']
             else:
-                default_logger.info(f"Inicializando grafo por defecto para planta {self.active_plant_id}")
+                default_logger.info("Inicializando grafo por defecto para planta %s", self.active_plant_id)
                 # Obtener configuración de la planta activa
-                plant_config = get_plant_config(self.active_plant_id)
-                circuitos = plant_config.get("circuitos", DEFAULT_CIRCUITOS)
-                ring_order = plant_config.get("ring_order", DEFAULT_RING_ORDER)
-                default_logger.debug(f"Configuración circuitos: {circuitos}")
+                plant_cfg = self._plant_cfg()
+                plant_config = plant_cfg.config
+                circuitos = plant_cfg.circuitos
+                ring_order = plant_cfg.ring_order
+                default_logger.debug("Configuración circuitos: %s", circuitos)
                 
                 # Crear nodo SET
                 self.G.add_node('SET', type='set', label='SET')
@@ -146,7 +618,7 @@ class NetworkModel:
                 for circuit_id, cts in circuitos.items():
                     for ct in cts:
                         if not self.G.has_node(ct):
-                            default_logger.debug(f"Añadiendo nodo CT: {ct} (circuito {circuit_id})")
+                            default_logger.debug("Añadiendo nodo CT: %s (circuito %s)", ct, circuit_id)
                             self.G.add_node(ct, type='ct', circuit=circuit_id, label=ct)
                         else:
                             self.G.nodes[ct]['circuit'] = circuit_id
@@ -160,7 +632,7 @@ class NetworkModel:
                     origen = 'SET'
                     destino = cts[0]
                     segment_id = f"{origen}-{destino}"
-                    default_logger.debug(f"Añadiendo enlace: {origen}->{destino} (circuito {circuit_id})")
+                    default_logger.debug("Añadiendo enlace: %s->%s (circuito %s)", origen, destino, circuit_id)
                     self.G.add_edge(
                         origen,
                         destino,
@@ -174,7 +646,7 @@ class NetworkModel:
                         origen = cts[i]
                         destino = cts[i+1]
                         segment_id = f"{origen}-{destino}"
-                        default_logger.debug(f"Añadiendo enlace: {origen}->{destino} (circuito {circuit_id})")
+                        default_logger.debug("Añadiendo enlace: %s->%s (circuito %s)", origen, destino, circuit_id)
                         self.G.add_edge(
                             origen,
                             destino,
@@ -191,115 +663,333 @@ class NetworkModel:
                         # Simplificado: usamos las coordenadas GPS como posición relativa
                         self.node_positions[node_id] = coords
             
-            # Invalidar caché
-            self._cache_valid = False
+            # Fibras de todos los enlaces en una sola matriz; cada enlace guarda la
+            # vista de su fila y la máscara de fibras 'ok' (derivada, no se persiste)
+            edge_fibers = [_fibers_from_status(data.get('fibers'))
+                           for _, _, data in _iter_edges(self.G)]
+            width = max([DEFAULT_TOTAL_FIBRAS, *map(len, edge_fibers)])
+            matrix = np.full((len(edge_fibers), width), _FIBER_ABSENT, dtype=np.uint8)
+            edge_rows = {}
+            for row, ((u, v, data), fibers) in enumerate(zip(_iter_edges(self.G), edge_fibers)):
+                matrix[row, :len(fibers)] = np.frombuffer(fibers, dtype=np.uint8)
+                data['fibers'] = matrix[row, :len(fibers)]
+                data['ok_mask'] = _fiber_ok_mask(fibers)
+                edge_rows[(u, v)] = row
+            self._fiber_matrix = matrix
+            self._edge_rows = edge_rows
+            self._fiber_counters = None
+            self._rebuild_segment_index()
+            # Los nodos solo cambian aquí: ordenar la lista de CTs una vez por grafo
+            self._ct_list_cache = tuple(sorted(
+                n for n, d in self.G.nodes(data=True) if d.get('type') == 'ct'
+            ))
+            
+            # El nuevo grafo no corresponde (aún) a ninguna configuración guardada
+            self._graph_dirty = True
+            self._synced_config = None
+            self.revision += 1
+            
+            # Descartar la caché del grafo anterior
+            self._segments_cache = None
             self._DG_cache = None
             self._last_cache_time = 0
-            default_logger.info(f"[INIT_GRAPH] FIN para planta: {self.active_plant_id} (nodos: {len(self.G.nodes())}, enlaces: {len(self.G.edges())})")
+            default_logger.info("[INIT_GRAPH] FIN para planta: %s (nodos: %d, enlaces: %d)", self.active_plant_id, self.G.number_of_nodes(), self.G.number_of_edges())
+    
+    def _rebuild_segment_index(self):
+        """Reconstruye el índice ID de segmento -> (u, v) a partir de G.
+        
+        Se registra el 'id' del enlace y ambas formas 'u-v' / 'v-u'; ante
+        colisiones prevalece el primer enlace en el orden de iteración de G,
+        igual que en la búsqueda lineal original. Debe llamarse con graph_lock.
+        """
+        index = {}
+        for u, v, data in _iter_edges(self.G):
+            for key in (data.get('id'), f"{u}-{v}", f"{v}-{u}"):
+                if key is not None:
+                    index.setdefault(key, (u, v))
+        self._segment_index = index
+    
+    def _find_segment(self, segment_id):
+        """Localiza un segmento por su ID en O(1).
+        
+        Args:
+            segment_id (str): ID del segmento ('id' del enlace, 'u-v' o 'v-u')
+            
+        Returns:
+            tuple: (u, v, data) del enlace o None si no existe. Debe llamarse con graph_lock.
+        """
+        edge = self._segment_index.get(segment_id)
+        if edge is None:
+            return None
+        u, v = edge
+        if not self.G.has_edge(u, v):
+            return None
+        return u, v, self.G[u][v]
+    
+    def _plant_cfg(self):
+        """Devuelve la configuración extraída de la planta activa (memoizada por planta).
+        
+        Returns:
+            _PlantSettings: Circuitos, orden del anillo y grupos de fibras
+        """
+        settings = self._plant_config_cache.get(self.active_plant_id)
+        if settings is None:
+            plant_config = get_plant_config(self.active_plant_id)
+            fibras_config = plant_config.get('fibras', {})
+            fibras_ida = tuple(fibras_config.get('comms_ida', DEFAULT_FIBRAS_COMMS_IDA))
+            fibras_vuelta = tuple(fibras_config.get('comms_vuelta', DEFAULT_FIBRAS_COMMS_VUELTA))
+            fibras_reserva = tuple(fibras_config.get('reserva', DEFAULT_FIBRAS_RESERVA))
+            fibras_cctv = tuple(fibras_config.get('cctv', DEFAULT_FIBRAS_CCTV))
+            circuitos = plant_config.get('circuitos', DEFAULT_CIRCUITOS)
+            ring_order = tuple(plant_config.get('ring_order', DEFAULT_RING_ORDER))
+            # Tipo de cada fibra; ante solapamientos prevalece el primer grupo
+            fiber_types = {}
+            for group, label in ((fibras_ida, "COMM-IDA"), (fibras_vuelta, "COMM-VUELTA"),
+                                 (fibras_reserva, "RESERVA"), (fibras_cctv, "CCTV")):
+                for fiber_num in group:
+                    fiber_types.setdefault(int(fiber_num), label)
+            settings = _PlantSettings(
+                config=plant_config,
+                circuitos=circuitos,
+                ring_order=ring_order,
+                fibras_ida=fibras_ida,
+                fibras_vuelta=fibras_vuelta,
+                fibras_reserva=fibras_reserva,
+                fibras_cctv=fibras_cctv,
+                mask_ida=_fibers_to_mask(fibras_ida),
+                mask_vuelta=_fibers_to_mask(fibras_vuelta),
+                comm_keys=frozenset(str(fn) for fn in fibras_ida + fibras_vuelta),
+                reserve_keys=frozenset(str(fn) for fn in fibras_reserva),
+                cctv_keys=frozenset(str(fn) for fn in fibras_cctv),
+                fiber_types=MappingProxyType(fiber_types),
+                fiber_report_labels=MappingProxyType({
+                    str(fn): f"  - F{fn} ({fiber_types.get(fn, '?')})"
+                    for fn in range(1, max([DEFAULT_TOTAL_FIBRAS, *fiber_types]) + 1)
+                }),
+                comm_cols=_fiber_columns(fn for fn, t in fiber_types.items() if t in ("COMM-IDA", "COMM-VUELTA")),
+                reserve_cols=_fiber_columns(fn for fn, t in fiber_types.items() if t == "RESERVA"),
+                cctv_cols=_fiber_columns(fn for fn, t in fiber_types.items() if t == "CCTV"),
+                ring_pairs=_ring_pairs(circuitos, ring_order),
+            )
+            self._plant_config_cache[self.active_plant_id] = settings
+        return settings
+    
+    def invalidate_plant_config(self, plant_id=None):
+        """Descarta la configuración de planta memoizada.
+        
+        Debe invocarse cuando cambia la configuración de una planta (o la planta
+        deja de existir) para que la siguiente consulta la vuelva a leer.
+        
+        Args:
+            plant_id: ID de la planta; None descarta las de todas las plantas
+        """
+        if plant_id is None:
+            self._plant_config_cache.clear()
+        else:
+            self._plant_config_cache.pop(plant_id, None)
+        get_plant_config.cache_clear()
+        if plant_id is None or plant_id == self.active_plant_id:
+            # 'comm_status' de la caché de segmentos depende de las fibras de comunicación
+            self._segments_cache = None
     
     def _get_initial_fiber_status(self):
-        """Genera estado inicial para todas las fibras."""
-        return {str(i): 'ok' for i in range(1, DEFAULT_TOTAL_FIBRAS + 1)}
+        """Genera estado inicial para todas las fibras (todas FIBER_OK)."""
+        return bytearray(DEFAULT_TOTAL_FIBRAS)
+    
+    def _cache_is_fresh(self):
+        """Indica si la caché publicada de DG es válida y no ha caducado."""
+        return (self._cache_valid and
+                time.time() - self._last_cache_time <= CACHE_EXPIRATION_TIME)
     
     def get_logical_graph(self):
-        """Construye y devuelve el grafo lógico dirigido."""
+        """Construye y devuelve el grafo lógico dirigido.
+        
+        DG se publica como instantánea inmutable, por lo que con la caché válida
+        se devuelve sin adquirir graph_lock. Los cambios de fibra solo parchean la
+        instantánea de adyacencia; DG se vuelve a construir cuando se pide.
+        """
+        DG = self._DG_cache
+        if DG is not None and self._cache_is_fresh():
+            return DG
         with self.graph_lock:
             logging.info("[GET_LOGICAL_GRAPH] Iniciando construcción/obtención de DG")
-            current_time = time.time()
-            if not self._cache_valid or self._DG_cache is None or (current_time - self._last_cache_time > CACHE_EXPIRATION_TIME):
-                logging.info("[GET_LOGICAL_GRAPH] Construyendo DG desde cero")
+            self._ensure_logical_graph()
+            if self._DG_cache is None:
                 self._DG_cache = self._build_directed_logical_graph_py()
-                self._cache_valid = True
-                self._last_cache_time = current_time
             logging.info("[GET_LOGICAL_GRAPH] Finalizado")
             return self._DG_cache
     
+    def _ensure_logical_graph(self):
+        """Reconstruye DG y su instantánea de adyacencia si la caché no es válida.
+        
+        Debe llamarse con graph_lock adquirido.
+        """
+        if self._DG_adj is None or not self._cache_is_fresh():
+            current_time = time.time()
+            logging.info("[GET_LOGICAL_GRAPH] Construyendo DG desde cero")
+            DG = self._build_directed_logical_graph_py()
+            self._DG_adj = _AdjacencySnapshot(DG)
+            self._DG_cache = DG
+            self._last_cache_time = current_time
+            self._cache_valid = True
+    
+    def _get_logical_adjacency(self):
+        """Devuelve la instantánea de adyacencia del grafo lógico.
+        
+        Returns:
+            _AdjacencySnapshot: Sucesores, predecesores y, si hay Numba, su forma CSR
+        """
+        # Lectura sin bloqueo: la instantánea nunca se modifica, solo se reemplaza
+        adjacency = self._DG_adj
+        if adjacency is not None and self._cache_is_fresh():
+            return adjacency
+        with self.graph_lock:
+            self._ensure_logical_graph()
+            return self._DG_adj
+    
     def _build_directed_logical_graph_py(self):
         logging.info("[BUILD_DG] INICIO para planta: %s", self.active_plant_id)
         DG = nx.DiGraph()
         DG.add_nodes_from(self.G.nodes(data=True))
-        plant_config = get_plant_config(self.active_plant_id)
-        fibras_config = plant_config.get('fibras', {})
-        fibras_ida = fibras_config.get('comms_ida', DEFAULT_FIBRAS_COMMS_IDA)
-        fibras_vuelta = fibras_config.get('comms_vuelta', DEFAULT_FIBRAS_COMMS_VUELTA)
-        for u, v, data in self.G.edges(data=True):
+        plant_cfg = self._plant_cfg()
+        mask_ida = plant_cfg.mask_ida
+        mask_vuelta = plant_cfg.mask_vuelta
+        for u, v, data in _iter_edges(self.G):
             segment_id = data.get('id', f"{u}-{v}")
             circuit_id = data.get('circuit')
-            fibers_status = data.get('fibers', {})
-            logging.debug(f"[BUILD_DG] Procesando enlace {u}-{v}")
-            if self._check_segment_path_direction(fibers_status, fibras_ida):
+            ok_mask = data.get('ok_mask', 0)
+            logging.debug("[BUILD_DG] Procesando enlace %s-%s", u, v)
+            if self._check_segment_path_direction(ok_mask, mask_ida):
                 DG.add_edge(u, v, type='ida', circuit=circuit_id, segment=segment_id)
-                logging.debug(f"[BUILD_DG] Añadido edge IDA {u}->{v}")
-            if self._check_segment_path_direction(fibers_status, fibras_vuelta):
+                logging.debug("[BUILD_DG] Añadido edge IDA %s->%s", u, v)
+            if self._check_segment_path_direction(ok_mask, mask_vuelta):
                 DG.add_edge(v, u, type='vuelta', circuit=circuit_id, segment=segment_id)
-                logging.debug(f"[BUILD_DG] Añadido edge VUELTA {v}->{u}")
+                logging.debug("[BUILD_DG] Añadido edge VUELTA %s->%s", v, u)
         self._add_ring_connections_py(DG)
         logging.info("[BUILD_DG] FIN para planta: %s", self.active_plant_id)
         return DG
     
-    def _check_segment_path_direction(self, fibers_status, direction_fibers):
-        """Verifica si existe al menos una fibra 'ok' en la dirección dada."""
-        if not fibers_status:
+    def _update_logical_segment(self, u, v, data):
+        """Actualiza en la caché las aristas IDA/VUELTA de un segmento modificado.
+        
+        Solo se tocan las aristas u -> v y v -> u de la instantánea de adyacencia;
+        los parches de SET se recalculan únicamente si una arista que cambia está
+        en un camino entre un par del anillo. DG se descarta y se reconstruye
+        al pedirlo (get_logical_graph). Debe llamarse con graph_lock adquirido.
+        
+        Args:
+            u, v: Extremos del segmento en el orden de G (IDA es u -> v)
+            data: Datos del enlace en G
+            
+        Returns:
+            bool: True si se actualizó la caché; False si no había caché válida
+        """
+        adjacency = self._DG_adj
+        if adjacency is None or not self._cache_valid:
             return False
+        plant_cfg = self._plant_cfg()
+        ok_mask = data.get('ok_mask', 0)
+        changes = []
+        for a, b, direction_mask in ((u, v, plant_cfg.mask_ida), (v, u, plant_cfg.mask_vuelta)):
+            present = self._check_segment_path_direction(ok_mask, direction_mask)
+            if present != (adjacency.has_edge(a, b) and (a, b) not in adjacency.patches):
+                changes.append((a, b, present))
         
-        for fiber_num in direction_fibers:
-            if fibers_status.get(str(fiber_num)) == 'ok':
-                return True
+        if changes:
+            # Copia en escritura: los lectores sin bloqueo pueden estar usando la instantánea
+            adjacency = adjacency.copy()
+            ring_pairs = plant_cfg.ring_pairs
+            repatch = False
+            for a, b, present in changes:
+                # La arista se evalúa en el grafo que la contiene (antes de quitarla)
+                if present:
+                    adjacency.add_edge(a, b)
+                repatch = repatch or _edge_on_ring_path(adjacency.succ, adjacency.pred, a, b, ring_pairs)
+                if not present:
+                    adjacency.remove_edge(a, b)
+            if repatch:
+                adjacency.remove_patches()
+                self._add_ring_connections(adjacency.succ, adjacency.pred,
+                                           lambda a, b, *_circuits: adjacency.add_patch(a, b))
+            self._DG_adj = adjacency
+            self._DG_cache = None
+        self._last_cache_time = time.time()
+        return True
+    
+    def _check_segment_path_direction(self, ok_mask, direction_mask):
+        """Verifica si existe al menos una fibra 'ok' en la dirección dada.
         
-        return False
+        Args:
+            ok_mask (int): Máscara de fibras 'ok' del segmento (data['ok_mask'])
+            direction_mask (int): Máscara de las fibras de la dirección
+                (_PlantSettings.mask_ida / mask_vuelta)
+        """
+        return bool(ok_mask & direction_mask)
     
     def _add_ring_connections_py(self, DG):
         """Añade conexiones lógicas de parcheo en SET entre circuitos evitando ciclos redundantes."""
-        plant_config = get_plant_config(self.active_plant_id)
-        ring_order = plant_config.get('ring_order', DEFAULT_RING_ORDER)
-        circuitos = plant_config.get('circuitos', DEFAULT_CIRCUITOS)
-        if not ring_order:
+        def add_patch(nodo_final, nodo_inicial, circuit_actual, circuit_siguiente):
+            DG.add_edge(
+                nodo_final, 
+                nodo_inicial, 
+                type='set_patch',
+                from_circuit=circuit_actual, 
+                to_circuit=circuit_siguiente
+            )
+        self._add_ring_connections(DG._succ, DG._pred, add_patch)
+    
+    def _add_ring_connections(self, succ, pred, add_patch):
+        """Añade los parches de SET sobre una adyacencia (DG o _AdjacencySnapshot).
+        
+        Args:
+            succ, pred: Adyacencia de sucesores y predecesores sin parches
+            add_patch: Función (nodo_final, nodo_inicial, circuito, circuito
+                siguiente) que añade el parche; debe reflejarse en succ/pred
+        """
+        ring_pairs = self._plant_cfg().ring_pairs
+        if not ring_pairs:
             return
-        num_circuits = len(ring_order)
-        for i in range(num_circuits):
-            circuit_actual = ring_order[i]
-            circuit_siguiente = ring_order[(i + 1) % num_circuits]
-            cts_actual = circuitos.get(circuit_actual, [])
-            cts_siguiente = circuitos.get(circuit_siguiente, [])
-            if not cts_actual or not cts_siguiente:
-                continue
-            nodo_final = cts_actual[-1]
-            nodo_inicial = cts_siguiente[0]
-            logging.debug(f"[ADD_RING] nodo_final: {nodo_final}, nodo_inicial: {nodo_inicial}")
-            path_exists = _has_path_limited_iterative(DG, nodo_final, nodo_inicial, max_depth=30)
-            logging.debug(f"[ADD_RING] path_exists({nodo_final}->{nodo_inicial}): {path_exists}")
-            if (DG.has_node(nodo_final) and DG.has_node('SET') and 
-                DG.has_node(nodo_inicial) and 
+        # En un anillo sano casi todos los pares se conectan a través de SET: un BFS
+        # desde y otro hacia SET los resuelven todos. Solo si falla se busca un camino
+        # directo. Añadir parches solo crea caminos, así que un positivo sigue siendo válido.
+        reach_from_set, reach_to_set = _compute_set_reachability(succ, pred, 'SET', max_depth=30)
+        for nodo_final, nodo_inicial, circuit_actual, circuit_siguiente in ring_pairs:
+            logging.debug("[ADD_RING] nodo_final: %s, nodo_inicial: %s", nodo_final, nodo_inicial)
+            path_exists = (
+                _path_via_source(reach_from_set, reach_to_set, nodo_final, nodo_inicial, max_depth=30) or
+                _bidir_reachable(succ, pred, nodo_final, nodo_inicial, max_depth=30)
+            )
+            logging.debug("[ADD_RING] path_exists(%s->%s): %s", nodo_final, nodo_inicial, path_exists)
+            if (nodo_final in succ and 'SET' in succ and 
+                nodo_inicial in succ and 
                 not path_exists):
-                DG.add_edge(
-                    nodo_final, 
-                    nodo_inicial, 
-                    type='set_patch',
-                    from_circuit=circuit_actual, 
-                    to_circuit=circuit_siguiente
-                )
-                logging.info(f"Añadiendo parche SET: {nodo_final} -> {nodo_inicial}")
+                add_patch(nodo_final, nodo_inicial, circuit_actual, circuit_siguiente)
+                logging.info("Añadiendo parche SET: %s -> %s", nodo_final, nodo_inicial)
         logging.info("[ADD_RING] FIN")
 
     def check_ct_connectivity(self, target_ct):
         """Verifica la conectividad bidireccional entre SET y un CT."""
         if target_ct == 'SET':
             return 'conectado'
-        with self.graph_lock:
-            if not self.G.has_node(target_ct):
-                default_logger.warning(f"check_ct_connectivity: Nodo {target_ct} no existe")
-                return 'error'
+        # Consulta atómica de un dict: no requiere graph_lock
+        if not self.G.has_node(target_ct):
+            default_logger.warning(f"check_ct_connectivity: Nodo {target_ct} no existe")
+            return 'error'
         try:
-            DG = self.get_logical_graph()
-            if not DG.has_node('SET') or not DG.has_node(target_ct):
+            adjacency = self._get_logical_adjacency()
+            if 'SET' not in adjacency or target_ct not in adjacency:
+                return 'aislado'
+            # Sin fibras de comunicación 'ok' en sus enlaces el CT no tiene arcos de
+            # entrada o de salida en DG: aislado sin necesidad de buscar caminos
+            if not adjacency.succ[target_ct] or not adjacency.pred[target_ct]:
                 return 'aislado'
             try:
-                has_path_to_ct = _has_path_limited_iterative(DG, 'SET', target_ct, max_depth=30)
+                has_path_to_ct = adjacency.has_path('SET', target_ct, max_depth=30)
             except Exception:
                 default_logger.error(f"Error en has_path entre SET y {target_ct}")
                 return 'error'
             try:
-                has_path_from_ct = _has_path_limited_iterative(DG, target_ct, 'SET', max_depth=30)
+                has_path_from_ct = adjacency.has_path(target_ct, 'SET', max_depth=30)
             except Exception:
                 default_logger.error(f"Error en has_path entre {target_ct} y SET")
                 return 'error'
@@ -314,11 +1004,12 @@ class NetworkModel:
     def _check_ring_integrity(self):
         """Verifica la integridad del anillo lógico evitando recursión infinita."""
         try:
-            DG = self.get_logical_graph()
+            adjacency = self._get_logical_adjacency()
+            reach_from_set, reach_to_set = adjacency.set_reachability()
             results = {}
-            plant_config = get_plant_config(self.active_plant_id)
-            ring_order = plant_config.get('ring_order', DEFAULT_RING_ORDER)
-            circuitos = plant_config.get('circuitos', DEFAULT_CIRCUITOS)
+            plant_cfg = self._plant_cfg()
+            ring_order = plant_cfg.ring_order
+            circuitos = plant_cfg.circuitos
             for i in range(len(ring_order)):
                 circuit_actual = ring_order[i]
                 circuit_siguiente = ring_order[(i + 1) % len(ring_order)]
@@ -332,9 +1023,12 @@ class NetworkModel:
                 if nodo_final == nodo_inicial:
                     results[f"{circuit_actual}-{circuit_siguiente}"] = False
                     continue
-                if DG.has_node(nodo_final) and DG.has_node(nodo_inicial):
+                if nodo_final in adjacency and nodo_inicial in adjacency:
                     try:
-                        has_path = _has_path_limited_iterative(DG, nodo_final, nodo_inicial, max_depth=30)
+                        has_path = (
+                            _path_via_source(reach_from_set, reach_to_set, nodo_final, nodo_inicial, max_depth=30) or
+                            adjacency.has_path(nodo_final, nodo_inicial, max_depth=30)
+                        )
                     except Exception:
                         default_logger.error(f"Error en has_path entre {nodo_final} y {nodo_inicial}")
                         has_path = False
@@ -347,59 +1041,42 @@ class NetworkModel:
             return {}
     
     def get_network_status(self):
-        """Obtiene el estado completo de la red."""
+        """Obtiene el estado completo de la red.
+        
+        El resultado incluye 'revision', el valor de self.revision al empezar el
+        cálculo: si G cambia durante el cálculo, la revisión del modelo ya no coincide.
+        """
+        revision = self.revision
         try:
-            try:
-                # Obtener todos los CTs
-                with self.graph_lock:
-                    all_cts = sorted([n for n, d in self.G.nodes(data=True) if d.get('type') == 'ct'])
-            except RecursionError:
-                print("[ERROR] RecursionError: El grafo es demasiado profundo o está corrupto (nodos).")
-                return {
-                    'ct_connectivity': {},
-                    'segment_statuses': [],
-                    'suggestions': ["ERROR: RecursionError: El grafo es demasiado profundo o está corrupto."]
-                }
+            # Todos los CTs (lista ordenada mantenida por _init_graph)
+            all_cts = self._ct_list_cache
 
-            # Verificar conectividad
+            # Verificar conectividad: un único BFS desde SET y otro hacia SET
+            # resuelven todos los CTs (equivalente a check_ct_connectivity por CT)
             ct_statuses = {}
-            for ct in all_cts:
-                try:
-                    ct_statuses[ct] = self.check_ct_connectivity(ct)
-                except RecursionError:
-                    print(f"[ERROR] RecursionError: El grafo es demasiado profundo o está corrupto (check_ct_connectivity para {ct}).")
-                    ct_statuses[ct] = 'error'
+            try:
+                adjacency = self._get_logical_adjacency()
+                reach_from_set, reach_to_set = adjacency.set_reachability()
+                for ct in all_cts:
+                    if ct in reach_from_set and ct in reach_to_set:
+                        ct_statuses[ct] = 'conectado'
+                    else:
+                        ct_statuses[ct] = 'aislado'
+            except Exception as e:
+                default_logger.error(f"Error calculando conectividad de CTs: {e}")
+                ct_statuses = {ct: 'error' for ct in all_cts}
 
-            # Obtener estado de segmentos
+            # Obtener estado de segmentos ('comm_status' se mantiene en la caché)
             segments = self.get_segment_data()
             
-            # Obtener configuración de fibras para la planta activa
-            plant_config = get_plant_config(self.active_plant_id)
-            fibras_config = plant_config.get('fibras', {})
-            
-            fibras_ida = fibras_config.get('comms_ida', DEFAULT_FIBRAS_COMMS_IDA)
-            fibras_vuelta = fibras_config.get('comms_vuelta', DEFAULT_FIBRAS_COMMS_VUELTA)
-            
-            # Calcular estado de comunicación por segmento
-            for segment in segments:
-                fibers = segment.get('fibers', {})
-                comm_status = 'ok'
-                
-                # Verificar fibras de comunicación
-                for fiber_num in fibras_ida + fibras_vuelta:
-                    if fibers.get(str(fiber_num)) == 'averiado':
-                        comm_status = 'faulty'
-                        break
-                
-                segment['comm_status'] = comm_status
-            
             # Generar sugerencias
             suggestions = self.get_reconnection_suggestions(ct_statuses, segments)
             
             return {
                 'ct_connectivity': ct_statuses,
                 'segment_statuses': segments,
-                'suggestions': suggestions
+                'suggestions': suggestions,
+                'revision': revision
             }
         except RecursionError:
             print("[ERROR] RecursionError: El grafo es demasiado profundo o está corrupto (get_network_status).")
@@ -418,36 +1095,45 @@ class NetworkModel:
             }
     
     def get_segment_data(self):
-        """Obtiene datos de todos los segmentos."""
+        """Obtiene datos de todos los segmentos.
+        
+        La lista se construye una vez por grafo y se mantiene al día (fibras,
+        'ok_mask' y 'comm_status') con graph_lock en update_fiber_status y
+        restore_segment_fibers; los llamadores no deben modificarla.
+        """
+        segments = self._segments_cache
+        if segments is not None:
+            return segments
+        
         segments = []
-        processed_edges = set()
+        segments_by_edge = {}
         
         with self.graph_lock:
-            for u, v, data in self.G.edges(data=True):
-                edge_key = tuple(sorted((u, v)))
-                if edge_key in processed_edges:
-                    continue
-                
-                processed_edges.add(edge_key)
+            # Estado de comunicación de todos los segmentos a la vez sobre la matriz de
+            # fibras: 'faulty' si alguna fibra de comunicación está 'averiado'
+            plant_cfg = self._plant_cfg()
+            matrix = self._fiber_matrix
+            comm_cols = plant_cfg.comm_cols[plant_cfg.comm_cols < matrix.shape[1]]
+            faulty = (matrix[:, comm_cols] == FIBER_AVERIADO).any(axis=1).tolist()
+            edge_rows = self._edge_rows
+            # G es un nx.Graph (no MultiGraph): edges() devuelve cada enlace una sola vez
+            for u, v, data in _iter_edges(self.G):
                 seg_data = data.copy()
                 seg_data['id'] = data.get('id', f"{u}-{v}")
                 seg_data['source'] = u
                 seg_data['target'] = v
                 
-                # Asegurar que las fibras estén correctamente formateadas
-                fibers_dict = seg_data.get('fibers', {})
-                if isinstance(fibers_dict, dict):
-                    seg_data['fibers'] = {
-                        str(k): (v_f if v_f in ['ok', 'averiado'] else 'ok')
-                        for k, v_f in fibers_dict.items()
-                    }
-                else:
-                    seg_data['fibers'] = self._get_initial_fiber_status()
+                # Los segmentos exponen las fibras como {número (str): estado}
+                seg_data['fibers'] = _fibers_to_status(data['fibers'])
+                seg_data['comm_status'] = 'faulty' if faulty[edge_rows[(u, v)]] else 'ok'
                 
                 segments.append(seg_data)
-        
-        # Ordenar segmentos
-        segments.sort(key=lambda x: (x.get('circuit', 'ZZZ'), x.get('id', '')))
+                segments_by_edge[(u, v)] = seg_data
+            
+            # Ordenar segmentos
+            segments.sort(key=lambda x: (x.get('circuit', 'ZZZ'), x.get('id', '')))
+            self._segments_by_edge = segments_by_edge
+            self._segments_cache = segments
         return segments
     
     def update_fiber_status(self, segment_id, fiber_num, new_status, user_id=None):
@@ -459,45 +1145,65 @@ class NetworkModel:
         updated = False
         message = f"Segmento {segment_id} no encontrado"
         with self.graph_lock:
-            for u, v, data in self.G.edges(data=True):
-                segment_match = (
-                    data.get('id') == segment_id or 
-                    f"{u}-{v}" == segment_id or 
-                    f"{v}-{u}" == segment_id
-                )
-                if segment_match:
-                    if 'fibers' not in data or not isinstance(data['fibers'], dict):
-                        data['fibers'] = self._get_initial_fiber_status()
-                    segment_found = True
-                    if fiber_key in data['fibers']:
-                        old_status = data['fibers'][fiber_key]
-                        if old_status != new_status:
-                            data['fibers'][fiber_key] = new_status
-                            updated = True
-                            message = f"Fibra {fiber_key} en segmento {segment_id} actualizada a '{new_status}'"
+            found = self._find_segment(segment_id)
+            if found is not None:
+                u, v, data = found
+                segment_found = True
+                fibers = data['fibers']
+                fiber_index = int(fiber_key) - 1 if fiber_key.isdigit() else -1
+                if 0 <= fiber_index < len(fibers) and fibers[fiber_index] != _FIBER_ABSENT:
+                    old_status = _FIBER_STATUS_NAMES[fibers[fiber_index]]
+                    if old_status != new_status:
+                        fiber_bit = 1 << fiber_index
+                        if new_status == 'ok':
+                            fibers[fiber_index] = FIBER_OK
+                            data['ok_mask'] = data.get('ok_mask', 0) | fiber_bit
+                            self._adjust_fiber_counters((fiber_index + 1,), 1)
+                        else:
+                            fibers[fiber_index] = FIBER_AVERIADO
+                            data['ok_mask'] = data.get('ok_mask', 0) & ~fiber_bit
+                            self._adjust_fiber_counters((fiber_index + 1,), -1)
+                        # Actualizar solo el segmento afectado en la caché de segmentos
+                        seg_data = self._segments_by_edge.get((u, v))
+                        if seg_data is not None:
+                            seg_data['fibers'][fiber_key] = new_status
+                            seg_data['ok_mask'] = data['ok_mask']
+                            seg_data['comm_status'] = _comm_status(fibers, self._plant_cfg().comm_cols)
+                        updated = True
+                        self._graph_dirty = True
+                        self.revision += 1
+                        message = f"Fibra {fiber_key} en segmento {segment_id} actualizada a '{new_status}'"
+                        # Parchear DG en lugar de reconstruirlo; si no hay caché
+                        # válida se reconstruirá en la próxima consulta
+                        if not self._update_logical_segment(u, v, data):
                             self._cache_valid = False
                             self._DG_cache = None
-                            # Registrar en log histórico
-                            if self.storage:
-                                self.storage.log_fiber_status_change(
-                                    self.active_plant_id, segment_id, fiber_key, old_status, new_status, user_id
-                                )
-                        else:
-                            message = f"Fibra {fiber_key} en {segment_id} ya estaba en estado '{new_status}'"
+                        # Registrar en log histórico
+                        if self.storage:
+                            self.storage.log_fiber_status_change(
+                                self.active_plant_id, segment_id, fiber_key, old_status, new_status, user_id
+                            )
                     else:
-                        message = f"Error: Fibra {fiber_key} no encontrada en el segmento {segment_id}"
-                        return False, message
-                    break
+                        message = f"Fibra {fiber_key} en {segment_id} ya estaba en estado '{new_status}'"
+                else:
+                    message = f"Error: Fibra {fiber_key} no encontrada en el segmento {segment_id}"
+                    return False, message
         return segment_found, message
     
     def get_reconnection_suggestions(self, ct_statuses, segments):
         """Genera sugerencias de diagnóstico basadas en el estado actual."""
         suggestions = []
         
-        # Análisis de estado de CTs
-        aislados = sorted([ct for ct, st in ct_statuses.items() if st == 'aislado'])
-        errores = sorted([ct for ct, st in ct_statuses.items() if st == 'error'])
-        conectados = sorted([ct for ct, st in ct_statuses.items() if st == 'conectado'])
+        # Análisis de estado de CTs (una sola pasada sobre ct_statuses)
+        aislados, errores, conectados = [], [], []
+        by_status = {'aislado': aislados, 'error': errores, 'conectado': conectados}
+        for ct, st in ct_statuses.items():
+            bucket = by_status.get(st)
+            if bucket is not None:
+                bucket.append(ct)
+        aislados.sort()
+        errores.sort()
+        conectados.sort()
         
         if errores:
             suggestions.append(f"🔴 ¡ERROR en CTs!: {', '.join(errores)}. Revisar logs o estado físico.")
@@ -513,13 +1219,16 @@ class NetworkModel:
                 suggestions.append("ℹ️ No hay CTs definidos o detectados en la red.")
         
         # Obtener configuración de fibras para la planta activa
-        plant_config = get_plant_config(self.active_plant_id)
-        fibras_config = plant_config.get('fibras', {})
-        
-        fibras_ida = fibras_config.get('comms_ida', DEFAULT_FIBRAS_COMMS_IDA)
-        fibras_vuelta = fibras_config.get('comms_vuelta', DEFAULT_FIBRAS_COMMS_VUELTA)
-        fibras_reserva = fibras_config.get('reserva', DEFAULT_FIBRAS_RESERVA)
-        fibras_cctv = fibras_config.get('cctv', DEFAULT_FIBRAS_CCTV)
+        plant_cfg = self._plant_cfg()
+        fibras_ida = plant_cfg.fibras_ida
+        fibras_vuelta = plant_cfg.fibras_vuelta
+        fibras_reserva = plant_cfg.fibras_reserva
+        fibras_cctv = plant_cfg.fibras_cctv
+        # Claves de fibra (str) calculadas una sola vez para todos los segmentos
+        str_ida = [str(fn) for fn in fibras_ida]
+        str_vuelta = [str(fn) for fn in fibras_vuelta]
+        str_reserva = [str(fn) for fn in fibras_reserva]
+        str_cctv = [str(fn) for fn in fibras_cctv]
         
         # Análisis de fibras
         suggestions.append("\n--- Diagnóstico de Fibras de Comunicación (1-4) ---")
@@ -531,13 +1240,13 @@ class NetworkModel:
             fibers = segment.get('fibers', {})
             
             # Fibras IDA
-            averiadas_ida = [fn for fn in fibras_ida if fibers.get(str(fn)) == 'averiado']
+            averiadas_ida = [fn for fn, key in zip(fibras_ida, str_ida) if fibers.get(key) == 'averiado']
             # Fibras VUELTA
-            averiadas_vuelta = [fn for fn in fibras_vuelta if fibers.get(str(fn)) == 'averiado']
+            averiadas_vuelta = [fn for fn, key in zip(fibras_vuelta, str_vuelta) if fibers.get(key) == 'averiado']
             # Fibras RESERVA
-            reservas_ok = sorted([int(fn) for fn in fibras_reserva if fibers.get(str(fn)) == 'ok'])
+            reservas_ok = sorted([int(fn) for fn, key in zip(fibras_reserva, str_reserva) if fibers.get(key) == 'ok'])
             # Fibras CCTV
-            cctv_averiadas = [fn for fn in fibras_cctv if fibers.get(str(fn)) == 'averiado']
+            cctv_averiadas = [fn for fn, key in zip(fibras_cctv, str_cctv) if fibers.get(key) == 'averiado']
             
             segment_suggestions = []
             
@@ -599,6 +1308,35 @@ class NetworkModel:
         suggestions.append("\nNOTA: Este diagnóstico es lógico. Siempre verificar físicamente las conexiones y equipos.")
         return suggestions
         
+    def _adjust_fiber_counters(self, fiber_numbers, delta):
+        """Actualiza los contadores de fibras 'ok' tras cambiar unas fibras (con graph_lock).
+        
+        Args:
+            fiber_numbers: Números de las fibras que han cambiado de estado
+            delta: +1 si han pasado a 'ok', -1 si han dejado de estarlo
+        """
+        if self._fiber_counters is None:
+            return
+        plant_cfg, counters = self._fiber_counters
+        for fiber_num in fiber_numbers:
+            counter = _FIBER_COUNTER_BY_TYPE.get(plant_cfg.fiber_types.get(fiber_num))
+            if counter is not None:
+                counters[counter] += delta
+    
+    def _count_ok_fibers(self, plant_cfg, rows=slice(None)):
+        """Cuenta las fibras 'ok' por tipo en unas filas de la matriz de fibras."""
+        ok = self._fiber_matrix[rows] == FIBER_OK
+        width = ok.shape[1]
+        
+        def _count(cols):
+            return int(np.count_nonzero(ok[:, cols[cols < width]]))
+        
+        return {
+            'comm_ok': _count(plant_cfg.comm_cols),
+            'reserve_ok': _count(plant_cfg.reserve_cols),
+            'cctv_ok': _count(plant_cfg.cctv_cols),
+        }
+    
     def get_fiber_statistics(self, segments):
         """Calcula estadísticas sobre el estado de las fibras."""
         if not segments:
@@ -608,36 +1346,53 @@ class NetworkModel:
                 'cctv_ok': 0, 'cctv_total': 0
             }
         
-        # Obtener configuración de fibras para la planta activa
-        plant_config = get_plant_config(self.active_plant_id)
-        fibras_config = plant_config.get('fibras', {})
+        # Conjuntos de claves de fibra por tipo (precalculados por planta)
+        plant_cfg = self._plant_cfg()
+        comm_keys = plant_cfg.comm_keys
+        reserve_keys = plant_cfg.reserve_keys
+        cctv_keys = plant_cfg.cctv_keys
         
-        fibras_ida = fibras_config.get('comms_ida', DEFAULT_FIBRAS_COMMS_IDA)
-        fibras_vuelta = fibras_config.get('comms_vuelta', DEFAULT_FIBRAS_COMMS_VUELTA)
-        fibras_reserva = fibras_config.get('reserva', DEFAULT_FIBRAS_RESERVA)
-        fibras_cctv = fibras_config.get('cctv', DEFAULT_FIBRAS_CCTV)
+        # Totales
+        total_comm_fibers = len(segments) * (len(plant_cfg.fibras_ida) + len(plant_cfg.fibras_vuelta))
+        total_reserve_fibers = len(segments) * len(plant_cfg.fibras_reserva)
+        total_cctv_fibers = len(segments) * len(plant_cfg.fibras_cctv)
         
-        comm_fibers_range = fibras_ida + fibras_vuelta
-        reserve_fibers_range = fibras_reserva
-        cctv_fibers_range = fibras_cctv
+        totals = {
+            'comm_total': total_comm_fibers,
+            'reserve_total': total_reserve_fibers,
+            'cctv_total': total_cctv_fibers
+        }
         
-        # Totales
-        total_comm_fibers = len(segments) * len(comm_fibers_range)
-        total_reserve_fibers = len(segments) * len(reserve_fibers_range)
-        total_cctv_fibers = len(segments) * len(cctv_fibers_range)
+        if segments is self._segments_cache and len(segments) == len(self._fiber_matrix):
+            # Lista completa de segmentos: contadores incrementales (O(1))
+            with self.graph_lock:
+                if self._fiber_counters is None or self._fiber_counters[0] is not plant_cfg:
+                    self._fiber_counters = (plant_cfg, self._count_ok_fibers(plant_cfg))
+                counts = dict(self._fiber_counters[1])
+            return {**counts, **totals}
+        
+        # Segmentos de G (p.ej. una lista de estado anterior): contar sobre sus filas
+        edge_rows = self._edge_rows
+        rows = [edge_rows.get((segment.get('source'), segment.get('target'))) for segment in segments]
+        if None not in rows:
+            return {**self._count_ok_fibers(plant_cfg, rows), **totals}
         
         # Contadores OK
         comm_fibers_ok = 0
         reserve_fibers_ok = 0
         cctv_fibers_ok = 0
         
+        # Segmentos ajenos a G: una sola pasada por las fibras de cada segmento
         for segment in segments:
-            fibers = segment.get('fibers', {})
-            
-            # Contar fibras OK por tipo
-            comm_fibers_ok += sum(1 for fn in comm_fibers_range if fibers.get(str(fn)) == 'ok')
-            reserve_fibers_ok += sum(1 for fn in reserve_fibers_range if fibers.get(str(fn)) == 'ok')
-            cctv_fibers_ok += sum(1 for fn in cctv_fibers_range if fibers.get(str(fn)) == 'ok')
+            for fiber_key, status in segment.get('fibers', {}).items():
+                if status != 'ok':
+                    continue
+                if fiber_key in comm_keys:
+                    comm_fibers_ok += 1
+                elif fiber_key in reserve_keys:
+                    reserve_fibers_ok += 1
+                elif fiber_key in cctv_keys:
+                    cctv_fibers_ok += 1
         
         return {
             'comm_ok': comm_fibers_ok,
@@ -655,34 +1410,35 @@ class NetworkModel:
         fibers_changed = 0
         
         with self.graph_lock:
-            for u, v, data in self.G.edges(data=True):
-                segment_match = (
-                    data.get('id') == segment_id or 
-                    f"{u}-{v}" == segment_id or 
-                    f"{v}-{u}" == segment_id
-                )
+            # Búsqueda O(1) en el índice de segmentos (mantenido por _init_graph)
+            found = self._find_segment(segment_id)
+            if found is not None:
+                u, v, data = found
+                segment_found = True
                 
-                if segment_match:
-                    segment_found = True
-                    
-                    # Asegurar que exista el diccionario de fibras
-                    if 'fibers' not in data or not isinstance(data['fibers'], dict):
-                        data['fibers'] = self._get_initial_fiber_status()
-                        fibers_changed = DEFAULT_TOTAL_FIBRAS
-                    else:
-                        # Restaurar solo las fibras averiadas
-                        for fiber_key in data['fibers']:
-                            if data['fibers'][fiber_key] == 'averiado':
-                                data['fibers'][fiber_key] = 'ok'
-                                fibers_changed += 1
-                    
-                    # Invalidar caché si hubo cambios
-                    if fibers_changed > 0:
+                # Restaurar las fibras averiadas (fila del segmento en la matriz)
+                fibers = data['fibers']
+                faulty = np.flatnonzero(fibers == FIBER_AVERIADO)
+                fibers_changed = len(faulty)
+                if fibers_changed:
+                    fibers[faulty] = FIBER_OK
+                    self._adjust_fiber_counters((faulty + 1).tolist(), 1)
+                    data['ok_mask'] = _fiber_ok_mask(fibers)
+                    self._graph_dirty = True
+                    self.revision += 1
+                    # Actualizar solo el segmento afectado en la caché de segmentos
+                    seg_data = self._segments_by_edge.get((u, v))
+                    if seg_data is not None:
+                        seg_data['fibers'] = _fibers_to_status(fibers)
+                        seg_data['ok_mask'] = data['ok_mask']
+                        seg_data['comm_status'] = 'ok'
+                    # Parchear DG como en update_fiber_status; si no hay caché
+                    # válida se reconstruirá en la próxima consulta
+                    if not self._update_logical_segment(u, v, data):
                         self._cache_valid = False
                         self._DG_cache = None
-                    
-                    message = f"{fibers_changed} fibras restauradas en segmento {segment_id}"
-                    break
+                
+                message = f"{fibers_changed} fibras restauradas en segmento {segment_id}"
         
         return segment_found, message
 
@@ -704,46 +1460,72 @@ class NetworkModel:
             if plant_id is None:
                 plant_id = self.active_plant_id
                 
-            # Capturar estado actual del grafo
+            # Sin cambios desde que se guardó o cargó esta misma configuración:
+            # no hay nada que escribir
+            if not self._graph_dirty and self._synced_config == (plant_id, name):
+                return True, f"Configuración '{name}' sin cambios para planta '{plant_id}'"
+            
+            # Capturar estado actual del grafo (instantánea independiente de G)
             graph_data = self._prepare_graph_data_for_save()
             
-            # Guardar en almacenamiento
-            success = self.storage.save_config(name, graph_data, plant_id)
+            # Serializar y escribir en segundo plano; las lecturas del almacenamiento
+            # a través del modelo esperan a que terminen (wait_for_saves)
+            future = self._save_executor.submit(self.storage.save_config, name, graph_data, plant_id)
+            future.add_done_callback(partial(self._on_save_done, plant_id, name))
+            self._mark_graph_synced(plant_id, name)
+            self._forget_plants_cache_for(plant_id)
             
-            if success:
-                return True, f"Configuración '{name}' guardada correctamente para planta '{plant_id}'"
-            else:
-                return False, f"Error al guardar configuración '{name}' para planta '{plant_id}'"
+            return True, f"Configuración '{name}' guardándose para planta '{plant_id}'"
         except Exception as e:
             default_logger.error(f"Error en save_configuration: {e}")
             return False, f"Error guardando configuración: {str(e)}"
     
-    def _prepare_graph_data_for_save(self):
+    def _on_save_done(self, plant_id, name, future):
+        """Registra el resultado de un guardado en segundo plano."""
+        try:
+            success = future.result()
+        except Exception as e:
+            default_logger.error(f"Error en save_configuration: {e}")
+            success = False
+        if not success:
+            default_logger.error(f"Error al guardar configuración '{name}' para planta '{plant_id}'")
+            # El almacenamiento no coincide con G: el próximo guardado debe escribir
+            if self._synced_config == (plant_id, name):
+                self._synced_config = None
+                self._graph_dirty = True
+    
+    def wait_for_saves(self):
+        """Espera a que terminen los guardados pendientes de save_configuration."""
+        # El ejecutor tiene un solo hilo: una tarea vacía termina después de todas las anteriores
+        self._save_executor.submit(lambda: None).result()
+    
+    def _prepare_graph_data_for_save(self, timestamp=None):
         """Prepara los datos del grafo para guardar.
         
+        Args:
+            timestamp: Marca de tiempo ISO a registrar; permite compartir una sola
+                marca entre varios guardados de un mismo lote (por defecto, ahora)
+        
         Returns:
             dict: Datos serializables del grafo
         """
         with self.graph_lock:
-            # Extraer nodos
-            nodes = []
-            for node_id, data in self.G.nodes(data=True):
-                node_data = {'id': node_id}
-                node_data.update(data)
-                nodes.append(node_data)
-            
-            # Extraer enlaces
-            edges = []
-            for u, v, data in self.G.edges(data=True):
-                edge_data = {'source': u, 'target': v}
-                edge_data.update(data)
-                edges.append(edge_data)
+            # Extraer nodos y enlaces (mismo formato que node_link_data: 'id' /
+            # 'source' y 'target' junto a los atributos)
+            nodes = [{'id': node_id, **data} for node_id, data in self.G.nodes(data=True)]
+            edges = [
+                # Formato serializado de las fibras (compatible con configuraciones guardadas)
+                {'source': u, 'target': v, **data, 'fibers': _fibers_to_status(data['fibers'])}
+                for u, v, data in _iter_edges(self.G)
+            ]
+            for edge_data in edges:
+                edge_data.pop('ok_mask', None)  # Derivado de 'fibers'
             
             return {
                 'nodes': nodes,
                 'edges': edges,
-                'node_positions': self.node_positions,
-                'timestamp': datetime.now().isoformat()
+                'node_positions': dict(self.node_positions),
+                'timestamp': timestamp or datetime.now().isoformat(timespec='seconds')
             }
     
     def load_configuration(self, name, plant_id=None):
@@ -765,6 +1547,7 @@ class NetworkModel:
                 plant_id = self.active_plant_id
                 
             # Cargar datos desde almacenamiento
+            self.wait_for_saves()
             graph_data = self.storage.load_config(name, plant_id)
             
             if not graph_data:
@@ -772,6 +1555,7 @@ class NetworkModel:
             
             # Reinicializar grafo con los datos cargados
             self._init_graph(graph_data)
+            self._mark_graph_synced(plant_id, name)
             
             return True, f"Configuración '{name}' cargada correctamente para planta '{plant_id}'"
         except Exception as e:
@@ -794,6 +1578,7 @@ class NetworkModel:
         if plant_id is None:
             plant_id = self.active_plant_id
             
+        self.wait_for_saves()
         return self.storage.list_configs(plant_id)
 
     def get_available_plants(self):
@@ -801,8 +1586,21 @@ class NetworkModel:
         if not self.storage:
             return ["default"]
         
-        plants = self.storage.get_plants()
-        return plants
+        # La lista se lee una vez y se invalida al crear, renombrar o eliminar plantas
+        if self._plants_cache is None:
+            self.wait_for_saves()
+            self._plants_cache = self.storage.get_plants()
+        return list(self._plants_cache)
+    
+    def _mark_graph_synced(self, plant_id, name):
+        """Registra que G coincide con la configuración guardada (plant_id, name)."""
+        self._graph_dirty = False
+        self._synced_config = (plant_id, name)
+    
+    def _forget_plants_cache_for(self, plant_id):
+        """Invalida la lista de plantas si save_config ha podido registrar una planta nueva."""
+        if self._plants_cache is not None and plant_id not in self._plants_cache:
+            self._plants_cache = None
     
     def set_active_plant(self, plant_id):
         """Establece la planta activa.
@@ -819,33 +1617,42 @@ class NetworkModel:
         # Verificar si la planta existe
         available_plants = self.get_available_plants()
         
-        # Si no existe y es la predefinida, crearla
-        if plant_id not in available_plants:
-            if plant_id == "Sabinar I":
-                # Crear planta con configuración predefinida
-                success, message = self.create_plant(plant_id, None)
-                if not success:
-                    return False, message
-            else:
-                return False, f"Planta '{plant_id}' no existe"
-        
-        # Actualizar planta activa
-        self.active_plant_id = plant_id
-        
-        # Cargar configuración por defecto para esta planta
-        default_config = None
+        # Esperar a los guardados en segundo plano antes de abrir la transacción:
+        # escriben con su propia conexión y quedarían bloqueados por la del lote
         if self.storage is not None:
-            default_config = self.storage.get_default_config(plant_id)
+            self.wait_for_saves()
         
-        if default_config:
-            self._init_graph(default_config)
-        else:
-            # Si no hay configuración por defecto, inicializar con datos base (constants)
-            self._init_graph()
-            # Guardar como configuración estándar para futuras cargas
+        # Creación, lectura y guardado de la configuración por defecto en una sola transacción
+        with self.storage.batch() if self.storage is not None else nullcontext():
+            # Si no existe y es la predefinida, crearla
+            if plant_id not in available_plants:
+                if plant_id == "Sabinar I":
+                    # Crear planta con configuración predefinida
+                    success, message = self.create_plant(plant_id, None)
+                    if not success:
+                        return False, message
+                else:
+                    return False, f"Planta '{plant_id}' no existe"
+            
+            # Actualizar planta activa
+            self.active_plant_id = plant_id
+            
+            # Cargar configuración por defecto para esta planta
+            default_config = None
             if self.storage is not None:
-                graph_data = self._prepare_graph_data_for_save()
-                self.storage.save_config("default", graph_data, plant_id, is_default=True)
+                default_config = self.storage.get_default_config(plant_id)
+            
+            if default_config:
+                self._init_graph(default_config)
+                self._mark_graph_synced(plant_id, "default")
+            else:
+                # Si no hay configuración por defecto, inicializar con datos base (constants)
+                self._init_graph()
+                # Guardar como configuración estándar para futuras cargas
+                if self.storage is not None:
+                    graph_data = self._prepare_graph_data_for_save()
+                    if self.storage.save_config("default", graph_data, plant_id, is_default=True):
+                        self._mark_graph_synced(plant_id, "default")
         
         return True, f"Planta '{plant_id}' activada correctamente"
     
@@ -867,36 +1674,44 @@ class NetworkModel:
         if plant_id in available_plants:
             return False, f"La planta '{plant_id}' ya existe"
         
-        # Crear planta
-        success = self.storage.create_plant(plant_id)
+        # Como en set_active_plant: los guardados pendientes no deben esperar al lote
+        self.wait_for_saves()
         
-        if not success:
-            return False, f"Error al crear planta '{plant_id}'"
-        
-        # Si especificaron planta base, copiar datos
-        if base_plant_id:
-            # Si base es la planta predefinida, usar configuración predefinida y guardar deep copy
-            if base_plant_id == "Sabinar I":
-                from copy import deepcopy
+        # Crear planta y su configuración por defecto en una sola transacción
+        with self.storage.batch():
+            success = self.storage.create_plant(plant_id)
+            self._plants_cache = None
+            
+            if not success:
+                return False, f"Error al crear planta '{plant_id}'"
+            
+            # Si especificaron planta base, copiar datos
+            if base_plant_id:
+                # Si base es la planta predefinida, usar configuración predefinida y guardar una copia
+                if base_plant_id == "Sabinar I":
+                    old_plant_id = self.active_plant_id
+                    self.active_plant_id = base_plant_id
+                    self._init_graph()  # Inicializar con datos predefinidos
+                    # Serializar una sola vez: el JSON se guarda tal cual y su lectura
+                    # es la copia para la nueva planta (más rápido que deepcopy)
+                    data_json = json.dumps(self._prepare_graph_data_for_save(), default=str)
+                    graph_data = json.loads(data_json)
+                    self.active_plant_id = plant_id
+                    self._init_graph(graph_data)  # Inicializar la nueva planta con la copia
+                    self.storage.save_config("default", graph_data, plant_id, is_default=True,
+                                             data_json=data_json)
+                    self.active_plant_id = old_plant_id
+                else:
+                    # Copiar configuraciones desde la planta base (base de datos)
+                    self.storage.copy_configurations(base_plant_id, plant_id)
+            else:
+                # Crear una configuración por defecto basada en constantes
                 old_plant_id = self.active_plant_id
-                self.active_plant_id = base_plant_id
-                self._init_graph()  # Inicializar con datos predefinidos
-                graph_data = deepcopy(self._prepare_graph_data_for_save())
                 self.active_plant_id = plant_id
-                self._init_graph(graph_data)  # Inicializar la nueva planta con la copia
+                self._init_graph()  # Inicializar con datos predefinidos
+                graph_data = self._prepare_graph_data_for_save()
                 self.storage.save_config("default", graph_data, plant_id, is_default=True)
                 self.active_plant_id = old_plant_id
-            else:
-                # Copiar configuraciones desde la planta base (base de datos)
-                self.storage.copy_configurations(base_plant_id, plant_id)
-        else:
-            # Crear una configuración por defecto basada en constantes
-            old_plant_id = self.active_plant_id
-            self.active_plant_id = plant_id
-            self._init_graph()  # Inicializar con datos predefinidos
-            graph_data = self._prepare_graph_data_for_save()
-            self.storage.save_config("default", graph_data, plant_id, is_default=True)
-            self.active_plant_id = old_plant_id
         
         return True, f"Planta '{plant_id}' creada correctamente"
     
@@ -922,11 +1737,16 @@ class NetworkModel:
         if new_id in available_plants:
             return False, f"Ya existe una planta con el nombre '{new_id}'"
         
-        # Renombrar
+        # Renombrar (después de los guardados pendientes de la planta)
+        self.wait_for_saves()
         success = self.storage.rename_plant(old_id, new_id)
+        self._plants_cache = None
+        self._synced_config = None
         
         if not success:
             return False, f"Error al renombrar planta '{old_id}'"
+        self.invalidate_plant_config(old_id)
+        self.invalidate_plant_config(new_id)
             
         # Actualizar planta activa si es necesario
         if self.active_plant_id == old_id:
@@ -955,11 +1775,15 @@ class NetworkModel:
         if len(available_plants) <= 1:
             return False, "No se puede eliminar la única planta disponible"
             
-        # Eliminar
+        # Eliminar (después de los guardados pendientes de la planta)
+        self.wait_for_saves()
         success = self.storage.delete_plant(plant_id)
+        self._plants_cache = None
+        self._synced_config = None
         
         if not success:
             return False, f"Error al eliminar planta '{plant_id}'"
+        self.invalidate_plant_config(plant_id)
             
         # Si era la planta activa, cambiar a otra
         if self.active_plant_id == plant_id:
@@ -982,78 +1806,67 @@ class NetworkModel:
             # Obtener estado actual
             status_data = self.get_network_status()
             
-            # Preparar contenido del informe
-            report = []
-            
-            # Encabezado
-            report.append("========================================")
-            report.append("INFORME DE DIAGNÓSTICO DE RED FIBRA ÓPTICA")
-            report.append(f"Planta: {self.active_plant_id}")
-            report.append(f"Fecha: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
-            report.append("========================================\n")
-            
-            # Estado de CTs
-            report.append("ESTADO DE CONECTIVIDAD DE CTs:")
-            report.append("-----------------------------")
+            # Prefijo de cada línea de fibra, ya clasificado por tipo (tabla por planta)
+            plant_cfg = self._plant_cfg()
+            fiber_labels = plant_cfg.fiber_report_labels
+            fiber_types = plant_cfg.fiber_types
             
-            ct_statuses = status_data.get('ct_connectivity', {})
-            for ct, status in sorted(ct_statuses.items()):
-                report.append(f"- {ct}: {status}")
-            
-            # Estado de segmentos
-            report.append("\nESTADO DE SEGMENTOS:")
-            report.append("-------------------")
-            
-            segments = status_data.get('segment_statuses', [])
-            for segment in segments:
-                seg_id = segment.get('id', '')
-                source = segment.get('source', '?')
-                target = segment.get('target', '?')
-                circuit = segment.get('circuit', 'N/A')
-                comm_status = segment.get('comm_status', 'ok')
+            def _report_lines():
+                """Genera las líneas del informe sin acumularlas en memoria."""
+                # Encabezado
+                yield "========================================"
+                yield "INFORME DE DIAGNÓSTICO DE RED FIBRA ÓPTICA"
+                yield f"Planta: {self.active_plant_id}"
+                yield f"Fecha: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}"
+                yield "========================================\n"
                 
-                report.append(f"\nSegmento: {seg_id} ({source}↔{target})")
-                report.append(f"Circuito: {circuit}")
-                report.append(f"Estado comm: {comm_status}")
+                # Estado de CTs
+                yield "ESTADO DE CONECTIVIDAD DE CTs:"
+                yield "-----------------------------"
                 
-                # Detalles de fibras
-                fibers = segment.get('fibers', {})
-                report.append("Fibras:")
+                ct_statuses = status_data.get('ct_connectivity', {})
+                for ct, status in sorted(ct_statuses.items()):
+                    yield f"- {ct}: {status}"
                 
-                # Obtener configuración de fibras
-                plant_config = get_plant_config(self.active_plant_id)
-                fibras_config = plant_config.get('fibras', {})
+                # Estado de segmentos
+                yield "\nESTADO DE SEGMENTOS:"
+                yield "-------------------"
                 
-                fibras_ida = fibras_config.get('comms_ida', DEFAULT_FIBRAS_COMMS_IDA)
-                fibras_vuelta = fibras_config.get('comms_vuelta', DEFAULT_FIBRAS_COMMS_VUELTA)
-                fibras_reserva = fibras_config.get('reserva', DEFAULT_FIBRAS_RESERVA)
-                fibras_cctv = fibras_config.get('cctv', DEFAULT_FIBRAS_CCTV)
-                
-                for fiber_num in sorted([int(fn) for fn in fibers.keys()]):
-                    status = fibers.get(str(fiber_num), 'ok')
-                    fiber_type = "?"
+                segments = status_data.get('segment_statuses', [])
+                for segment in segments:
+                    seg_id = segment.get('id', '')
+                    source = segment.get('source', '?')
+                    target = segment.get('target', '?')
+                    circuit = segment.get('circuit', 'N/A')
+                    comm_status = segment.get('comm_status', 'ok')
                     
-                    if fiber_num in fibras_ida:
-                        fiber_type = "COMM-IDA"
-                    elif fiber_num in fibras_vuelta:
-                        fiber_type = "COMM-VUELTA"
-                    elif fiber_num in fibras_reserva:
-                        fiber_type = "RESERVA"
-                    elif fiber_num in fibras_cctv:
-                        fiber_type = "CCTV"
+                    yield f"\nSegmento: {seg_id} ({source}↔{target})"
+                    yield f"Circuito: {circuit}"
+                    yield f"Estado comm: {comm_status}"
                     
-                    report.append(f"  - F{fiber_num} ({fiber_type}): {status}")
-            
-            # Sugerencias
-            report.append("\nSUGERENCIAS:")
-            report.append("-----------")
-            
-            for suggestion in status_data.get('suggestions', ["No hay sugerencias disponibles."]):
-                report.append(suggestion)
+                    # Detalles de fibras (las claves ya están en orden numérico)
+                    yield "Fibras:"
+                    for fiber_key, status in segment.get('fibers', {}).items():
+                        label = fiber_labels.get(fiber_key)
+                        if label is None:  # Fibra fuera de la tabla (segmento con más fibras)
+                            fiber_num = int(fiber_key)
+                            label = f"  - F{fiber_num} ({fiber_types.get(fiber_num, '?')})"
+                        yield f"{label}: {status}"
+                
+                # Sugerencias
+                yield "\nSUGERENCIAS:"
+                yield "-----------"
+                
+                yield from status_data.get('suggestions', ["No hay sugerencias disponibles."])
             
-            # Escribir a archivo
-            with open(file_path, 'w', encoding='utf-8') as file:
-                file.write('\n'.join(report))
+            # Escribir a archivo línea a línea (sin construir el informe completo)
+            with open(file_path, 'w', encoding='utf-8', buffering=1 << 16) as file:
+                write = file.write
+                lines = _report_lines()
+                write(next(lines))
+                for line in lines:
+                    write('\n')
+                    write(line)
             
             return True, f"Diagnóstico exportado a {file_path}"
         except Exception as e:
@@ -1069,6 +1882,7 @@ class NetworkModel:
         # Guardar como configuración 'cctv' (nombre fijo)
         try:
             success = self.storage.save_config("cctv", cctv_data, plant_id)
+            self._forget_plants_cache_for(plant_id)
             if success:
                 return True, f"Configuración CCTV guardada para planta '{plant_id}'"
             else:
@@ -1087,8 +1901,6 @@ class NetworkModel:
             if cctv_data is not None:
                 return cctv_data
             # Si no hay config guardada, usar la de constantes
-            from constants import get_cctv_config
             return get_cctv_config(plant_id)
         except Exception:
-            from constants import get_cctv_config
             return get_cctv_config(plant_id)
\ No newline at end of file
@@ -5,10 +5,196 @@ import logging
 import sqlite3
 import os
 import json
+import threading
+import time
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from datetime import datetime
 
 logger = logging.getLogger(__name__)
 
+# PRAGMAs aplicados a cada conexión al abrirla. journal_mode=WAL queda grabado
+# en el fichero; el resto son por conexión.
+_CONNECTION_PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA cache_size=-65536",
+    "PRAGMA mmap_size=268435456",
+)
+
+# Los cambios de estado de fibra se acumulan y el hilo escritor los inserta en
+# bloque al llegar a este número de eventos o al pasar este tiempo (s) desde el
+# primero pendiente
+FIBER_LOG_FLUSH_SIZE = 50
+FIBER_LOG_FLUSH_INTERVAL = 2.0
+
+# Sentencias de las rutas más frecuentes. sqlite3 cachea por conexión las
+# sentencias preparadas por texto SQL: usar siempre estas constantes garantiza
+# que cada llamada reutiliza la misma sentencia ya preparada.
+_STATEMENT_CACHE_SIZE = 256
+_SQL_ENSURE_PLANT = "INSERT INTO plants (id, name) VALUES (?, ?) ON CONFLICT(id) DO NOTHING"
+_SQL_CLEAR_DEFAULT = "UPDATE configurations SET is_default = 0 WHERE plant_id = ? AND is_default = 1"
+# UPSERT: actualiza la fila existente en lugar de borrarla y reinsertarla como
+# INSERT OR REPLACE, de modo que se conservan su id y su fecha de creación
+_SQL_SAVE_CONFIG = (
+    "INSERT INTO configurations (name, plant_id, data, is_default, modified) "
+    "VALUES (?, ?, ?, ?, datetime('now')) "
+    "ON CONFLICT(name, plant_id) DO UPDATE SET "
+    "data = excluded.data, is_default = excluded.is_default, modified = excluded.modified"
+)
+_SQL_LOAD_CONFIG = "SELECT data FROM configurations WHERE name = ? AND plant_id = ?"
+_SQL_DELETE_CONFIG = "DELETE FROM configurations WHERE name = ? AND plant_id = ?"
+# El instante del evento se pasa como segundos Unix (time.time()) y SQLite lo
+# formatea como ISO 8601 en hora local, sin crear objetos datetime en Python
+_SQL_FIBER_LOG_TIMESTAMP = "strftime('%Y-%m-%dT%H:%M:%f', ?, 'unixepoch', 'localtime')"
+_SQL_INSERT_FIBER_LOG = (
+    "INSERT INTO fiber_status_log "
+    "(timestamp, plant_id, segment_id, fiber_num, old_status, new_status, user_id) "
+    f"VALUES ({_SQL_FIBER_LOG_TIMESTAMP}, ?, ?, ?, ?, ?, ?)"
+)
+
+# Las configuraciones cuyo JSON supera este tamaño (bytes) se guardan como BLOB
+# comprimido con zlib; las menores se guardan como texto JSON
+_COMPRESS_MIN_BYTES = 512
+
+def _build_config_zdict():
+    """Construye el diccionario predefinido de zlib para las configuraciones.
+    
+    Contiene los fragmentos JSON que se repiten en toda configuración guardada
+    (nodos, enlaces con sus 16 fibras, CCTV), de modo que incluso el primer
+    enlace de cada configuración se comprime por referencia.
+    """
+    fibers = ',"fibers":{' + ','.join(f'"{i}":"ok"' for i in range(1, 17)) + '}}'
+    return ''.join((
+        '"averiado"',
+        '{"camaras":1,"baculos":["B01"]}',
+        '"timestamp":"2026-01-01T00:00:00"}',
+        '"node_positions":{}',
+        '{"id":"CT01","type":"ct","circuit":"C1","label":"CT01"},',
+        '{"nodes":[{"id":"SET","type":"set","label":"SET"},',
+        '],"edges":[{"source":"SET","target":"CT01","id":"SET-CT01","circuit":"C1"', fibers,
+        ',{"source":"CT01","target":"CT02","id":"CT01-CT02","circuit":"C1"', fibers,
+    )).encode('utf-8')
+
+# Diccionario predefinido de zlib (~20 % menos bytes por configuración). Los BLOB
+# guardados lo referencian por su checksum: NO debe modificarse nunca.
+_CONFIG_ZDICT = _build_config_zdict()
+
+def _encode_config(config_data, data_json=None):
+    """Serializa una configuración para la columna data.
+    
+    Args:
+        config_data: Datos de configuración
+        data_json: JSON ya serializado de config_data (opcional)
+        
+    Returns:
+        str | bytes: JSON compacto o, si es grande, JSON comprimido con zlib
+    """
+    if data_json is None:
+        data_json = json.dumps(config_data, default=str, separators=(',', ':'), ensure_ascii=False)
+    raw = data_json.encode('utf-8')
+    if len(raw) < _COMPRESS_MIN_BYTES:
+        return data_json
+    # Nivel 1: casi la misma reducción que niveles altos a una fracción del coste
+    compressor = zlib.compressobj(1, zdict=_CONFIG_ZDICT)
+    return compressor.compress(raw) + compressor.flush()
+
+def _config_json(value):
+    """Devuelve el JSON del valor de la columna data (descomprimiendo los BLOB).
+    
+    zlib solo usa el diccionario si el BLOB lo requiere, así que también se leen
+    los BLOB comprimidos sin diccionario.
+    """
+    if isinstance(value, bytes):
+        decompressor = zlib.decompressobj(zdict=_CONFIG_ZDICT)
+        return decompressor.decompress(value) + decompressor.flush()
+    return value
+
+# Máximo de configuraciones cuyo JSON se conserva en memoria (LRU)
+_CONFIG_CACHE_SIZE = 32
+
+# Tabla clave/valor con marcas de mantenimiento de la propia base de datos
+_SQL_CREATE_META = "CREATE TABLE IF NOT EXISTS meta (k TEXT PRIMARY KEY, v TEXT)"
+_SQL_GET_META = "SELECT v FROM meta WHERE k = ?"
+_SQL_SET_META = "INSERT INTO meta (k, v) VALUES (?, ?) ON CONFLICT(k) DO UPDATE SET v = excluded.v"
+_META_CLEANUP_DONE = 'bootstrap_cleanup_done'
+
+# Esquema completo (tablas y planta por defecto); los índices se crean en
+# ConfigStorage._ensure_indices(). Se ejecuta sentencia a sentencia y no con
+# executescript(), que confirmaría antes la transacción abierta en _init_db.
+_SCHEMA_DDL = (
+    # Tabla de plantas
+    '''
+    CREATE TABLE IF NOT EXISTS plants (
+        id TEXT PRIMARY KEY,
+        name TEXT NOT NULL,
+        description TEXT,
+        created TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        modified TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+    ''',
+    # Planta por defecto
+    '''
+    INSERT OR IGNORE INTO plants (id, name, description)
+    VALUES ('default', 'Planta por defecto', 'Planta creada automáticamente')
+    ''',
+    # Tabla de configuraciones con soporte multi-planta
+    '''
+    CREATE TABLE IF NOT EXISTS configurations (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        name TEXT NOT NULL,
+        plant_id TEXT NOT NULL,
+        data TEXT NOT NULL,
+        is_default INTEGER DEFAULT 0,
+        created TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        modified TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        UNIQUE(name, plant_id),
+        FOREIGN KEY (plant_id) REFERENCES plants(id)
+    )
+    ''',
+    # Tabla de log de cambios de estado de fibras
+    '''
+    CREATE TABLE IF NOT EXISTS fiber_status_log (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        timestamp TEXT NOT NULL DEFAULT (strftime('%Y-%m-%dT%H:%M:%f', 'now', 'localtime')),
+        plant_id TEXT NOT NULL,
+        segment_id TEXT NOT NULL,
+        fiber_num INTEGER NOT NULL,
+        old_status TEXT NOT NULL,
+        new_status TEXT NOT NULL,
+        user_id TEXT,
+        FOREIGN KEY (plant_id) REFERENCES plants(id)
+    )
+    ''',
+    _SQL_CREATE_META,
+)
+
+# Columnas devueltas por get_plant_info() y list_plants()
+_PLANT_FIELDS = ('id', 'name', 'description', 'created', 'modified')
+
+class _BatchConnection:
+    """Conexión compartida dentro de ConfigStorage.batch().
+    
+    commit() no hace nada: la transacción se confirma una sola vez al
+    terminar el lote.
+    """
+    
+    __slots__ = ('_conn',)
+    
+    def __init__(self, conn):
+        object.__setattr__(self, '_conn', conn)
+    
+    def __getattr__(self, name):
+        return getattr(self._conn, name)
+    
+    def __setattr__(self, name, value):
+        setattr(self._conn, name, value)
+    
+    def commit(self):
+        pass
+
 class ConfigStorage:
     """Clase para gestionar la persistencia de configuraciones usando SQLite con soporte multi-planta."""
     
@@ -19,6 +205,22 @@ class ConfigStorage:
             db_path: Ruta al archivo SQLite
         """
         self.db_path = db_path
+        self._local = threading.local()  # Conexión persistente y lote activo (por hilo)
+        self._connections = []  # Todas las conexiones abiertas, para close()
+        self._connections_lock = threading.Lock()
+        self._pending_fiber_log = []  # Eventos de fibra aún no escritos
+        self._fiber_log_lock = threading.Lock()
+        self._fiber_log_full = threading.Event()  # Despierta al escritor antes de tiempo
+        self._writer = None  # Hilo escritor (ThreadPoolExecutor de un hilo), bajo demanda
+        self._schema_ready = False  # True cuando _init_db ha creado/migrado el esquema
+        # Caché LRU de lecturas: clave ('name', plant_id, nombre) o ('default', plant_id)
+        # -> JSON ya descomprimido. Cada lectura deserializa su propia copia.
+        self._config_cache = {}
+        self._config_cache_version = 0  # Se incrementa con cada escritura
+        self._config_cache_lock = threading.Lock()
+        # IDs de planta en el orden de get_plants() y como conjunto (plant_exists);
+        # None hasta la primera consulta. Comparte versión y lock con _config_cache.
+        self._plants_cache = None
         
         # Asegurar que el directorio existe
         os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
@@ -28,20 +230,80 @@ class ConfigStorage:
         
         logger.info(f"Almacenamiento configurado en: {db_path}")
     
+    def _thread_connection(self):
+        """Devuelve la conexión persistente del hilo actual, abriéndola la primera vez."""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            # check_same_thread=False solo para poder cerrarla desde close()
+            conn = sqlite3.connect(
+                self.db_path, check_same_thread=False,
+                cached_statements=_STATEMENT_CACHE_SIZE
+            )
+            for pragma in _CONNECTION_PRAGMAS:
+                conn.execute(pragma)
+            with self._connections_lock:
+                self._connections.append(conn)
+            self._local.conn = conn
+        elif conn.in_transaction:
+            # Transacción que dejó a medias una operación fallida anterior
+            conn.rollback()
+        conn.row_factory = None
+        return conn
+    
+    def _connect(self):
+        """Devuelve la conexión persistente del hilo o, dentro de batch(), la del lote."""
+        batch_conn = getattr(self._local, 'batch_conn', None)
+        if batch_conn is not None:
+            batch_conn.row_factory = None
+            return batch_conn
+        return self._thread_connection()
+    
+    @contextmanager
+    def batch(self):
+        """Agrupa varias operaciones de escritura en una sola transacción.
+        
+        Dentro del bloque todas las operaciones del hilo comparten una conexión
+        y se confirman con un único commit al salir (rollback si hay excepción).
+        Los bloques anidados se integran en el lote exterior.
+        """
+        if getattr(self._local, 'batch_conn', None) is not None:
+            yield self
+            return
+        conn = self._thread_connection()
+        self._local.batch_conn = _BatchConnection(conn)
+        try:
+            yield self
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            self._local.batch_conn = None
+            # Lo leído durante el lote puede no reflejar su commit final
+            self._invalidate_config_cache()
+    
     def _init_db(self):
-        """Inicializa la estructura de la base de datos."""
+        """Inicializa la estructura de la base de datos.
+        
+        Las comprobaciones de esquema, la migración y la limpieza de plantas
+        obsoletas se ejecutan en una única transacción (un solo commit).
+        """
+        conn = None
         try:
-            conn = sqlite3.connect(self.db_path)
+            conn = self._connect()
             conn.row_factory = sqlite3.Row  # Para acceder a columnas por nombre
+            conn.execute("BEGIN IMMEDIATE")
             cursor = conn.cursor()
             
+            # Tablas existentes, con una sola consulta al catálogo
+            tables = self._existing_tables(cursor)
+            
             # Verificar si existe la tabla con formato antiguo (sin soporte multi-planta)
-            cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='configurations'")
-            old_table_exists = cursor.fetchone() is not None
+            old_table_exists = 'configurations' in tables
             
             # Verificar si tenemos el nuevo esquema
-            cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='plants'")
-            new_schema_exists = cursor.fetchone() is not None
+            new_schema_exists = 'plants' in tables
+            schema_changed = True
             
             # Verificar la estructura de la tabla configurations
             if old_table_exists:
@@ -60,41 +322,96 @@ class ConfigStorage:
                     self._migrate_schema(conn, cursor)
                 else:
                     # Crear índices en caso de que falten
-                    self._ensure_indices(conn, cursor)
+                    self._ensure_indices(conn, cursor, tables)
+                    schema_changed = False
             else:
                 # Crear esquema nuevo si no existe
                 if not new_schema_exists:
                     self._create_schema(conn, cursor)
+                else:
+                    schema_changed = False
             
-            # Verificar existencia de tablas antes de eliminar registros
-            cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='plants'")
-            if cursor.fetchone():
-                cursor.execute("DELETE FROM plants WHERE name = ?", ("Olmedilla",))
-                cursor.execute("DELETE FROM plants WHERE name = ?", ("Sabinar II",))
-            
-            cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='configurations'")
-            if cursor.fetchone():
-                cursor.execute("DELETE FROM configurations WHERE plant_id = ?", ("Olmedilla",))
-                cursor.execute("DELETE FROM configurations WHERE plant_id = ?", ("Sabinar II",))
-            
-            cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='network_data'")
-            if cursor.fetchone():
-                cursor.execute("DELETE FROM network_data WHERE plant_id = ?", ("Olmedilla",))
-                cursor.execute("DELETE FROM network_data WHERE plant_id = ?", ("Sabinar II",))
+            # Solo se vuelve a consultar el catálogo si se creó o migró el esquema
+            if schema_changed:
+                tables = self._existing_tables(cursor)
             
-            cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='node_positions'")
-            if cursor.fetchone():
-                cursor.execute("DELETE FROM node_positions WHERE plant_id = ?", ("Olmedilla",))
-                cursor.execute("DELETE FROM node_positions WHERE plant_id = ?", ("Sabinar II",))
+            # La limpieza de plantas obsoletas se hace una sola vez por base de
+            # datos: queda marcada en la tabla meta
+            if 'meta' in tables:
+                cursor.execute(_SQL_GET_META, (_META_CLEANUP_DONE,))
+                cleanup_done = cursor.fetchone() is not None
+            else:
+                cursor.execute(_SQL_CREATE_META)
+                cleanup_done = False
+            
+            if not cleanup_done:
+                # Eliminar las plantas obsoletas de las tablas que existan
+                obsolete_plants = ("Olmedilla", "Sabinar II")
+                if 'plants' in tables:
+                    cursor.execute("DELETE FROM plants WHERE name IN (?, ?)", obsolete_plants)
+                for table in ('configurations', 'network_data', 'node_positions'):
+                    if table in tables:
+                        cursor.execute(f"DELETE FROM {table} WHERE plant_id IN (?, ?)", obsolete_plants)
+                cursor.execute(_SQL_SET_META, (_META_CLEANUP_DONE, '1'))
             
             conn.commit()
-            conn.close()
+            
+            # Actualizar las estadísticas del planificador (sqlite_stat1) si lo
+            # necesitan, p.ej. tras crear o migrar el esquema
+            conn.execute("PRAGMA optimize")
+            self._schema_ready = True
             
             logger.info("Base de datos inicializada correctamente")
         except Exception as e:
+            if conn is not None and conn.in_transaction:
+                conn.rollback()
             logger.error(f"Error inicializando base de datos: {e}")
             raise
     
+    def _get_cached_config(self, key):
+        """Devuelve (JSON en caché o None, versión de la caché) para una clave."""
+        with self._config_cache_lock:
+            value = self._config_cache.pop(key, None)
+            if value is not None:
+                self._config_cache[key] = value  # Más reciente al final
+            return value, self._config_cache_version
+    
+    def _store_cached_config(self, key, version, value):
+        """Guarda un JSON leído si no ha habido escrituras desde que se leyó."""
+        with self._config_cache_lock:
+            if version != self._config_cache_version:
+                return
+            self._config_cache[key] = value
+            if len(self._config_cache) > _CONFIG_CACHE_SIZE:
+                del self._config_cache[next(iter(self._config_cache))]
+    
+    def _invalidate_config_cache(self, *plant_ids, plants_changed=False):
+        """Descarta las lecturas en caché de las plantas indicadas (o todas).
+        
+        Se llama después del commit de cada escritura.
+        
+        Args:
+            plant_ids: Plantas afectadas (ninguna: descartar todo)
+            plants_changed: Si la escritura añadió, renombró o eliminó plantas
+        """
+        with self._config_cache_lock:
+            self._config_cache_version += 1
+            if plants_changed or not plant_ids:
+                self._plants_cache = None
+            if plant_ids:
+                self._config_cache = {
+                    key: value for key, value in self._config_cache.items()
+                    if key[1] not in plant_ids
+                }
+            else:
+                self._config_cache.clear()
+    
+    @staticmethod
+    def _existing_tables(cursor):
+        """Devuelve el conjunto de nombres de tabla de la base de datos."""
+        cursor.execute("SELECT name FROM sqlite_master WHERE type='table'")
+        return {row[0] for row in cursor.fetchall()}
+    
     def _backup_and_recreate_schema(self, conn, cursor):
         """Hace backup de los datos existentes y recrea el esquema"""
         try:
@@ -140,64 +457,41 @@ class ConfigStorage:
             logger.error(f"Error durante backup y recreación: {e}")
             raise
     
-    def _ensure_indices(self, conn, cursor):
-        """Crea índices si no existen"""
-        # Asegurarse que los índices existen
-        cursor.execute('CREATE INDEX IF NOT EXISTS idx_config_plant_id ON configurations(plant_id)')
+    def _ensure_indices(self, conn, cursor, tables=None):
+        """Crea índices si no existen
+        
+        Args:
+            tables: Conjunto de tablas existentes, si ya se conoce (opcional)
+        """
+        # Asegurarse que los índices existen. Los compuestos permiten resolver
+        # list_configs, get_default_config y get_fiber_status_history recorriendo
+        # el índice ya ordenado, sin ordenar los resultados aparte.
         cursor.execute('CREATE INDEX IF NOT EXISTS idx_config_is_default ON configurations(is_default)')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_config_plant_mod ON configurations(plant_id, modified DESC)')
+        cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_config_plant_default_mod
+            ON configurations(plant_id, is_default, modified DESC)
+        ''')
+        # idx_config_plant_mod cubre también las búsquedas solo por plant_id
+        cursor.execute('DROP INDEX IF EXISTS idx_config_plant_id')
+        
+        if tables is None:
+            tables = self._existing_tables(cursor)
+        if 'fiber_status_log' in tables:
+            cursor.execute('''
+                CREATE INDEX IF NOT EXISTS idx_fiber_log_plant_seg_fib_ts
+                ON fiber_status_log(plant_id, segment_id, fiber_num, timestamp DESC)
+            ''')
         logger.info("Índices verificados")
     
     def _create_schema(self, conn, cursor):
         """Crea el esquema de la base de datos desde cero."""
-        # Tabla de plantas
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS plants (
-                id TEXT PRIMARY KEY,
-                name TEXT NOT NULL,
-                description TEXT,
-                created TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                modified TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        ''')
-        
-        # Añadir planta por defecto
-        cursor.execute('''
-            INSERT OR IGNORE INTO plants (id, name, description)
-            VALUES ('default', 'Planta por defecto', 'Planta creada automáticamente')
-        ''')
-        
-        # Tabla de configuraciones con soporte multi-planta
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS configurations (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                name TEXT NOT NULL,
-                plant_id TEXT NOT NULL,
-                data TEXT NOT NULL,
-                is_default INTEGER DEFAULT 0,
-                created TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                modified TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                UNIQUE(name, plant_id),
-                FOREIGN KEY (plant_id) REFERENCES plants(id)
-            )
-        ''')
-        
-        # Tabla de log de cambios de estado de fibras
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS fiber_status_log (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                timestamp TEXT NOT NULL,
-                plant_id TEXT NOT NULL,
-                segment_id TEXT NOT NULL,
-                fiber_num INTEGER NOT NULL,
-                old_status TEXT NOT NULL,
-                new_status TEXT NOT NULL,
-                user_id TEXT,
-                FOREIGN KEY (plant_id) REFERENCES plants(id)
-            )
-        ''')
+        # Tablas y planta por defecto (_SCHEMA_DDL), dentro de la transacción en curso
+        for statement in _SCHEMA_DDL:
+            cursor.execute(statement)
         
-        # Índices
-        self._ensure_indices(conn, cursor)
+        # Índices (fiber_status_log acaba de crearse: no hace falta consultar el catálogo)
+        self._ensure_indices(conn, cursor, tables={'fiber_status_log'})
         
         logger.info("Esquema de base de datos creado")
     
@@ -229,7 +523,7 @@ class ConfigStorage:
             logger.error(f"Error durante la migración de datos: {e}")
             raise
     
-    def save_config(self, name, config_data, plant_id="default", is_default=False):
+    def save_config(self, name, config_data, plant_id="default", is_default=False, data_json=None):
         """Guarda una configuración.
         
         Args:
@@ -237,48 +531,35 @@ class ConfigStorage:
             config_data: Datos de configuración (se serializarán a JSON)
             plant_id: ID de la planta
             is_default: Si es la configuración por defecto para la planta
+            data_json: JSON ya serializado de config_data (opcional, evita serializar de nuevo)
             
         Returns:
             bool: True si se guardó correctamente
         """
         try:
-            # Serializar a JSON
-            data_json = json.dumps(config_data, default=str)
+            # Serializar a JSON (comprimido si es grande)
+            data_value = _encode_config(config_data, data_json)
             
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
-            # Verificar si existen las tablas necesarias
-            cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='plants'")
-            plants_exists = cursor.fetchone() is not None
+            # _init_db ya garantiza el esquema: no consultar sqlite_master en cada guardado
+            if not self._schema_ready:
+                self._init_db()
             
-            cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='configurations'")
-            config_exists = cursor.fetchone() is not None
-            
-            # Si no existen las tablas, crear el esquema
-            if not plants_exists or not config_exists:
-                self._create_schema(conn, cursor)
+            conn = self._connect()
+            cursor = conn.cursor()
             
             # Asegurar que la planta existe
-            cursor.execute('INSERT OR IGNORE INTO plants (id, name) VALUES (?, ?)', 
-                          (plant_id, plant_id))
+            cursor.execute(_SQL_ENSURE_PLANT, (plant_id, plant_id))
+            plant_created = cursor.rowcount > 0
             
             if is_default:
                 # Quitar la marca de defecto de otras configuraciones de la misma planta
-                cursor.execute('''
-                    UPDATE configurations SET is_default = 0
-                    WHERE plant_id = ? AND is_default = 1
-                ''', (plant_id,))
+                cursor.execute(_SQL_CLEAR_DEFAULT, (plant_id,))
             
             # Insertar o actualizar
-            cursor.execute('''
-                INSERT OR REPLACE INTO configurations 
-                (name, plant_id, data, is_default, modified) 
-                VALUES (?, ?, ?, ?, datetime('now'))
-            ''', (name, plant_id, data_json, 1 if is_default else 0))
+            cursor.execute(_SQL_SAVE_CONFIG, (name, plant_id, data_value, 1 if is_default else 0))
             
             conn.commit()
-            conn.close()
+            self._invalidate_config_cache(plant_id, plants_changed=plant_created)
             
             logger.info(f"Configuración '{name}' guardada correctamente para planta '{plant_id}'")
             return True
@@ -297,20 +578,17 @@ class ConfigStorage:
             dict: Datos de configuración o None si no se encuentra
         """
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
-            cursor.execute('''
-                SELECT data FROM configurations 
-                WHERE name = ? AND plant_id = ?
-            ''', (name, plant_id))
-            
-            row = cursor.fetchone()
-            conn.close()
-            
-            if row:
-                # Deserializar JSON
-                config_data = json.loads(row[0])
+            key = ('name', plant_id, name)
+            data, version = self._get_cached_config(key)
+            if data is None:
+                row = self._connect().execute(_SQL_LOAD_CONFIG, (name, plant_id)).fetchone()
+                if row:
+                    data = _config_json(row[0])
+                    self._store_cached_config(key, version, data)
+            
+            if data is not None:
+                # Deserializar JSON (copia independiente para quien llama)
+                config_data = json.loads(data)
                 logger.info(f"Configuración '{name}' cargada correctamente para planta '{plant_id}'")
                 return config_data
             else:
@@ -330,7 +608,12 @@ class ConfigStorage:
             dict: Datos de configuración por defecto o None si no hay
         """
         try:
-            conn = sqlite3.connect(self.db_path)
+            key = ('default', plant_id)
+            data, version = self._get_cached_config(key)
+            if data is not None:
+                return json.loads(data)
+            
+            conn = self._connect()
             cursor = conn.cursor()
             
             cursor.execute('''
@@ -350,12 +633,11 @@ class ConfigStorage:
                 ''', (plant_id,))
                 row = cursor.fetchone()
             
-            conn.close()
-            
             if row:
                 # Deserializar JSON
-                config_data = json.loads(row[0])
-                return config_data
+                data = _config_json(row[0])
+                self._store_cached_config(key, version, data)
+                return json.loads(data)
             else:
                 return None
         except Exception as e:
@@ -372,27 +654,17 @@ class ConfigStorage:
             list: Lista de diccionarios con información de configuraciones
         """
         try:
-            conn = sqlite3.connect(self.db_path)
-            conn.row_factory = sqlite3.Row
-            cursor = conn.cursor()
-            
-            cursor.execute('''
+            rows = self._connect().execute('''
                 SELECT name, is_default, created, modified FROM configurations
                 WHERE plant_id = ?
                 ORDER BY modified DESC
-            ''', (plant_id,))
+            ''', (plant_id,)).fetchall()
             
-            configs = []
-            for row in cursor.fetchall():
-                configs.append({
-                    'name': row['name'],
-                    'is_default': bool(row['is_default']),
-                    'created': row['created'],
-                    'modified': row['modified']
-                })
-            
-            conn.close()
-            return configs
+            # Filas como tuplas: desempaquetado posicional en una sola comprensión
+            return [
+                {'name': name, 'is_default': bool(is_default), 'created': created, 'modified': modified}
+                for name, is_default, created, modified in rows
+            ]
         except Exception as e:
             logger.error(f"Error listando configuraciones para planta '{plant_id}': {e}")
             return []
@@ -408,17 +680,14 @@ class ConfigStorage:
             bool: True si se eliminó correctamente
         """
         try:
-            conn = sqlite3.connect(self.db_path)
+            conn = self._connect()
             cursor = conn.cursor()
             
-            cursor.execute('''
-                DELETE FROM configurations 
-                WHERE name = ? AND plant_id = ?
-            ''', (name, plant_id))
+            cursor.execute(_SQL_DELETE_CONFIG, (name, plant_id))
             
             result = cursor.rowcount > 0
             conn.commit()
-            conn.close()
+            self._invalidate_config_cache(plant_id)
             
             if result:
                 logger.info(f"Configuración '{name}' eliminada correctamente de planta '{plant_id}'")
@@ -437,19 +706,32 @@ class ConfigStorage:
             list: Lista de IDs de plantas
         """
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
-            cursor.execute('SELECT id FROM plants ORDER BY name')
-            
-            plants = [row[0] for row in cursor.fetchall()]
-            conn.close()
-            
+            plants = list(self._plant_ids()[0])
             return plants if plants else ["default"]
         except Exception as e:
             logger.error(f"Error obteniendo lista de plantas: {e}")
             return ["default"]
     
+    def _plant_ids(self):
+        """Devuelve (IDs de planta ordenados por nombre, conjunto de IDs), con caché.
+        
+        La caché se descarta en cada escritura que añade, renombra o elimina plantas.
+        """
+        with self._config_cache_lock:
+            cached = self._plants_cache
+            version = self._config_cache_version
+        if cached is not None:
+            return cached
+        
+        rows = self._connect().execute('SELECT id FROM plants ORDER BY name').fetchall()
+        ids = tuple(row[0] for row in rows)
+        cached = (ids, frozenset(ids))
+        with self._config_cache_lock:
+            # No guardar una lectura que se haya cruzado con una escritura
+            if version == self._config_cache_version:
+                self._plants_cache = cached
+        return cached
+    
     def plant_exists(self, plant_id):
         """Verifica si una planta existe.
         
@@ -460,15 +742,7 @@ class ConfigStorage:
             bool: True si la planta existe
         """
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
-            cursor.execute('SELECT 1 FROM plants WHERE id = ?', (plant_id,))
-            
-            exists = cursor.fetchone() is not None
-            conn.close()
-            
-            return exists
+            return plant_id in self._plant_ids()[1]
         except Exception as e:
             logger.error(f"Error verificando existencia de planta '{plant_id}': {e}")
             return False
@@ -488,7 +762,7 @@ class ConfigStorage:
             if not name:
                 name = plant_id
                 
-            conn = sqlite3.connect(self.db_path)
+            conn = self._connect()
             cursor = conn.cursor()
             
             cursor.execute('''
@@ -497,7 +771,7 @@ class ConfigStorage:
             ''', (plant_id, name, description))
             
             conn.commit()
-            conn.close()
+            self._invalidate_config_cache(plant_id, plants_changed=True)
             
             logger.info(f"Planta '{plant_id}' creada correctamente")
             return True
@@ -523,28 +797,28 @@ class ConfigStorage:
             if not new_name:
                 new_name = new_id
                 
-            conn = sqlite3.connect(self.db_path)
+            if old_id == new_id:
+                logger.warning(f"Ya existe una planta con ID '{new_id}'")
+                return False
+            
+            conn = self._connect()
             cursor = conn.cursor()
             
-            # Verificar que la planta existe
-            cursor.execute('SELECT 1 FROM plants WHERE id = ?', (old_id,))
-            if not cursor.fetchone():
-                conn.close()
-                logger.warning(f"La planta '{old_id}' no existe")
-                return False
-                
-            # Verificar que el nuevo ID no existe
-            cursor.execute('SELECT 1 FROM plants WHERE id = ?', (new_id,))
-            if cursor.fetchone():
-                conn.close()
+            # Actualizar planta: la clave primaria rechaza un ID nuevo ya existente
+            # y rowcount indica si la planta original existía (sin consultas previas)
+            try:
+                cursor.execute('''
+                    UPDATE plants SET id = ?, name = ?, modified = datetime('now')
+                    WHERE id = ?
+                ''', (new_id, new_name, old_id))
+            except sqlite3.IntegrityError:
+                conn.rollback()
                 logger.warning(f"Ya existe una planta con ID '{new_id}'")
                 return False
-            
-            # Actualizar planta
-            cursor.execute('''
-                UPDATE plants SET id = ?, name = ?, modified = datetime('now')
-                WHERE id = ?
-            ''', (new_id, new_name, old_id))
+            if cursor.rowcount == 0:
+                conn.rollback()
+                logger.warning(f"La planta '{old_id}' no existe")
+                return False
             
             # Actualizar referencias en configuraciones
             cursor.execute('''
@@ -553,7 +827,7 @@ class ConfigStorage:
             ''', (new_id, old_id))
             
             conn.commit()
-            conn.close()
+            self._invalidate_config_cache(old_id, new_id, plants_changed=True)
             
             logger.info(f"Planta '{old_id}' renombrada a '{new_id}'")
             return True
@@ -571,24 +845,26 @@ class ConfigStorage:
             bool: True si se eliminó correctamente
         """
         try:
-            conn = sqlite3.connect(self.db_path)
+            conn = self._connect()
             cursor = conn.cursor()
             
-            # Verificar que no es la última planta
-            cursor.execute('SELECT COUNT(*) FROM plants')
-            if cursor.fetchone()[0] <= 1:
-                conn.close()
-                logger.warning("No se puede eliminar la última planta")
-                return False
+            # Eliminar planta salvo que sea la última (comprobado en la misma sentencia)
+            cursor.execute('''
+                DELETE FROM plants
+                WHERE id = ? AND (SELECT COUNT(*) FROM plants) > 1
+            ''', (plant_id,))
+            if cursor.rowcount == 0:
+                cursor.execute('SELECT COUNT(*) FROM plants')
+                if cursor.fetchone()[0] <= 1:
+                    conn.rollback()
+                    logger.warning("No se puede eliminar la última planta")
+                    return False
             
             # Eliminar configuraciones de la planta
             cursor.execute('DELETE FROM configurations WHERE plant_id = ?', (plant_id,))
             
-            # Eliminar planta
-            cursor.execute('DELETE FROM plants WHERE id = ?', (plant_id,))
-            
             conn.commit()
-            conn.close()
+            self._invalidate_config_cache(plant_id, plants_changed=True)
             
             logger.info(f"Planta '{plant_id}' y sus configuraciones eliminadas correctamente")
             return True
@@ -607,40 +883,33 @@ class ConfigStorage:
             bool: True si se copiaron correctamente
         """
         try:
-            conn = sqlite3.connect(self.db_path)
+            conn = self._connect()
             cursor = conn.cursor()
             
-            # Verificar que ambas plantas existen
-            cursor.execute('SELECT 1 FROM plants WHERE id = ?', (source_plant_id,))
-            if not cursor.fetchone():
-                conn.close()
+            # Verificar que ambas plantas existen (una sola consulta)
+            cursor.execute('SELECT id FROM plants WHERE id IN (?, ?)', (source_plant_id, target_plant_id))
+            existing = {row[0] for row in cursor.fetchall()}
+            if source_plant_id not in existing:
                 logger.warning(f"La planta origen '{source_plant_id}' no existe")
                 return False
-                
-            cursor.execute('SELECT 1 FROM plants WHERE id = ?', (target_plant_id,))
-            if not cursor.fetchone():
-                conn.close()
+            if target_plant_id not in existing:
                 logger.warning(f"La planta destino '{target_plant_id}' no existe")
                 return False
             
-            # Obtener configuraciones de origen
+            # Copiar todas las configuraciones de origen con una sola sentencia
+            # (los datos no pasan por Python). UPSERT: las configuraciones que ya
+            # existían en destino se actualizan en su sitio
             cursor.execute('''
-                SELECT name, data, is_default FROM configurations
-                WHERE plant_id = ?
-            ''', (source_plant_id,))
-            
-            configs = cursor.fetchall()
-            
-            # Copiar cada configuración
-            for name, data, is_default in configs:
-                cursor.execute('''
-                    INSERT OR REPLACE INTO configurations
-                    (name, plant_id, data, is_default, created, modified)
-                    VALUES (?, ?, ?, ?, datetime('now'), datetime('now'))
-                ''', (name, target_plant_id, data, is_default))
+                INSERT INTO configurations
+                (name, plant_id, data, is_default, created, modified)
+                SELECT name, ?, data, is_default, datetime('now'), datetime('now')
+                FROM configurations WHERE plant_id = ?
+                ON CONFLICT(name, plant_id) DO UPDATE SET
+                    data = excluded.data, is_default = excluded.is_default, modified = excluded.modified
+            ''', (target_plant_id, source_plant_id))
             
             conn.commit()
-            conn.close()
+            self._invalidate_config_cache(target_plant_id)
             
             logger.info(f"Configuraciones copiadas de '{source_plant_id}' a '{target_plant_id}'")
             return True
@@ -658,28 +927,12 @@ class ConfigStorage:
             dict: Información de la planta o None si no existe
         """
         try:
-            conn = sqlite3.connect(self.db_path)
-            conn.row_factory = sqlite3.Row
-            cursor = conn.cursor()
-            
-            cursor.execute('''
+            row = self._connect().execute('''
                 SELECT id, name, description, created, modified FROM plants
                 WHERE id = ?
-            ''', (plant_id,))
-            
-            row = cursor.fetchone()
-            conn.close()
+            ''', (plant_id,)).fetchone()
             
-            if row:
-                return {
-                    'id': row['id'],
-                    'name': row['name'],
-                    'description': row['description'],
-                    'created': row['created'],
-                    'modified': row['modified']
-                }
-            else:
-                return None
+            return dict(zip(_PLANT_FIELDS, row)) if row else None
         except Exception as e:
             logger.error(f"Error obteniendo información de planta '{plant_id}': {e}")
             return None
@@ -691,70 +944,106 @@ class ConfigStorage:
             list: Lista de diccionarios con información de plantas
         """
         try:
-            conn = sqlite3.connect(self.db_path)
-            conn.row_factory = sqlite3.Row
-            cursor = conn.cursor()
-            
-            cursor.execute('''
+            rows = self._connect().execute('''
                 SELECT id, name, description, created, modified FROM plants
                 ORDER BY name
-            ''')
+            ''').fetchall()
             
-            plants = []
-            for row in cursor.fetchall():
-                plants.append({
-                    'id': row['id'],
-                    'name': row['name'],
-                    'description': row['description'],
-                    'created': row['created'],
-                    'modified': row['modified']
-                })
-                
-            conn.close()
-            return plants
+            return [dict(zip(_PLANT_FIELDS, row)) for row in rows]
         except Exception as e:
             logger.error(f"Error listando plantas: {e}")
             return []
     
     def log_fiber_status_change(self, plant_id, segment_id, fiber_num, old_status, new_status, user_id=None):
-        """Registra un cambio de estado de fibra en el log histórico."""
+        """Registra un cambio de estado de fibra en el log histórico.
+        
+        El evento se acumula y el hilo escritor lo inserta junto con otros en
+        una única transacción (ver FIBER_LOG_FLUSH_SIZE / FIBER_LOG_FLUSH_INTERVAL),
+        de modo que quien llama nunca espera al commit. Las consultas de
+        historial y close() escriben antes los eventos pendientes.
+        
+        Returns:
+            bool: True (el evento queda encolado)
+        """
+        # Se guarda el instante del evento (no el de la escritura del bloque)
+        event = (time.time(), plant_id, segment_id, fiber_num, old_status, new_status, user_id)
+        with self._fiber_log_lock:
+            first = not self._pending_fiber_log
+            self._pending_fiber_log.append(event)
+            full = len(self._pending_fiber_log) >= FIBER_LOG_FLUSH_SIZE
+            if first:
+                # Un bloque nuevo: programar su escritura en el hilo escritor
+                if self._writer is None:
+                    self._writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="storage-writer")
+                self._writer.submit(self._write_pending_fiber_log)
+        if full:
+            self._fiber_log_full.set()
+        logger.info(f"Log cambio fibra: {plant_id} {segment_id} F{fiber_num} {old_status}->{new_status}")
+        return True
+    
+    def _write_pending_fiber_log(self):
+        """Tarea del hilo escritor: espera a que el bloque se llene o venza el plazo y lo escribe."""
+        self._fiber_log_full.wait(FIBER_LOG_FLUSH_INTERVAL)
+        self._fiber_log_full.clear()
+        self.flush_fiber_log()
+    
+    def log_fiber_status_changes(self, events):
+        """Registra varios cambios de estado de fibra en una sola transacción.
+        
+        Args:
+            events: Iterable de tuplas (plant_id, segment_id, fiber_num,
+                old_status, new_status, user_id)
+            
+        Returns:
+            bool: True si se registraron correctamente
+        """
+        timestamp = time.time()
+        return self._write_fiber_log([(timestamp, *event) for event in events])
+    
+    def flush_fiber_log(self):
+        """Escribe en la base de datos los cambios de fibra pendientes.
+        
+        Returns:
+            bool: True si no quedaba nada o se escribieron correctamente
+        """
+        with self._fiber_log_lock:
+            events, self._pending_fiber_log = self._pending_fiber_log, []
+        return self._write_fiber_log(events)
+    
+    def _write_fiber_log(self, rows):
+        """Inserta filas (segundos Unix, plant_id, ...) en fiber_status_log con un único commit."""
+        if not rows:
+            return True
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            cursor.execute('''
-                INSERT INTO fiber_status_log (timestamp, plant_id, segment_id, fiber_num, old_status, new_status, user_id)
-                VALUES (?, ?, ?, ?, ?, ?, ?)
-            ''', (
-                datetime.now().isoformat(),
-                plant_id,
-                segment_id,
-                fiber_num,
-                old_status,
-                new_status,
-                user_id
-            ))
+            conn = self._connect()
+            conn.executemany(_SQL_INSERT_FIBER_LOG, rows)
             conn.commit()
-            conn.close()
-            logger.info(f"Log cambio fibra: {plant_id} {segment_id} F{fiber_num} {old_status}->{new_status}")
             return True
         except Exception as e:
             logger.error(f"Error registrando log de fibra: {e}")
             return False
     
-    def get_fiber_status_history(self, plant_id=None, segment_id=None, fiber_num=None, limit=100):
+    def get_fiber_status_history(self, plant_id=None, segment_id=None, fiber_num=None, limit=100,
+                                 before_ts=None, before_id=None):
         """Consulta el historial de cambios de estado de fibras.
         Args:
             plant_id: ID de la planta (opcional)
             segment_id: ID del segmento (opcional)
             fiber_num: número de fibra (opcional)
             limit: máximo de registros a devolver
+            before_ts: solo registros anteriores a este timestamp (opcional). Para
+                paginar se pasan el timestamp y el id del último registro de la
+                página anterior.
+            before_id: desempate para before_ts (opcional): con el mismo timestamp
+                solo se devuelven registros de id menor. Un lote de cambios comparte
+                timestamp, así que sin él se perderían filas entre páginas.
         Returns:
-            Lista de dicts con los campos del log ordenados por timestamp descendente.
+            Lista de dicts con los campos del log ordenados por timestamp e id
+            descendentes.
         """
+        self.flush_fiber_log()
         try:
-            conn = sqlite3.connect(self.db_path)
-            conn.row_factory = sqlite3.Row
-            cursor = conn.cursor()
+            cursor = self._connect().cursor()
             query = "SELECT * FROM fiber_status_log WHERE 1=1"
             params = []
             if plant_id:
@@ -766,17 +1055,54 @@ class ConfigStorage:
             if fiber_num:
                 query += " AND fiber_num = ?"
                 params.append(int(fiber_num))
-            query += " ORDER BY timestamp DESC LIMIT ?"
+            if before_ts:
+                # Paginación por clave: búsqueda en el índice en lugar de OFFSET
+                if before_id is not None:
+                    query += " AND (timestamp < ? OR (timestamp = ? AND id < ?))"
+                    params.extend((before_ts, before_ts, before_id))
+                else:
+                    query += " AND timestamp < ?"
+                    params.append(before_ts)
+            query += " ORDER BY timestamp DESC, id DESC LIMIT ?"
             params.append(limit)
             cursor.execute(query, params)
             rows = cursor.fetchall()
-            conn.close()
-            return [dict(row) for row in rows]
+            # Nombres de columna una sola vez; cada fila es una tupla
+            columns = [column[0] for column in cursor.description]
+            return [dict(zip(columns, row)) for row in rows]
         except Exception as e:
             logger.error(f"Error consultando historial de fibras: {e}")
             return []
     
     def close(self):
-        """Cierra cualquier recurso pendiente."""
-        # No hay recursos persistentes que cerrar en esta implementación
-        pass
\ No newline at end of file
+        """Cierra las conexiones persistentes de todos los hilos.
+        
+        Antes termina el hilo escritor, escribe los cambios de fibra pendientes
+        y ejecuta PRAGMA optimize para que SQLite actualice las estadísticas de
+        las consultas realizadas. Un uso posterior del almacenamiento vuelve a
+        abrir conexiones.
+        """
+        with self._fiber_log_lock:
+            writer, self._writer = self._writer, None
+        if writer is not None:
+            self._fiber_log_full.set()  # No esperar al plazo del bloque en curso
+            writer.shutdown(wait=True)
+            self._fiber_log_full.clear()
+        self.flush_fiber_log()
+        self._invalidate_config_cache()
+        with self._connections_lock:
+            connections, self._connections = self._connections, []
+        self._local = threading.local()
+        for conn in connections:
+            try:
+                conn.execute("PRAGMA optimize")
+                conn.close()
+            except Exception as e:
+                logger.error(f"Error cerrando conexión a la base de datos: {e}")
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+        return False
@@ -6,7 +6,11 @@ import os
 import sys
 import math
 import random  # Necesario para simulación de fallos aleatorios en sandbox
+from collections import Counter
 from datetime import datetime
+from functools import cached_property, lru_cache
+from operator import methodcaller
+from weakref import WeakKeyDictionary
 
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
@@ -15,11 +19,11 @@ from PyQt6.QtWidgets import (
     QPushButton, QLabel, QListWidget, QListWidgetItem,
     QGroupBox, QMessageBox, QTextEdit, QDialog, QLineEdit, 
     QDialogButtonBox, QFileDialog, QComboBox, QMenu, QFrame, QGridLayout,
-    QGraphicsView, QGraphicsScene, QGraphicsEllipseItem, QGraphicsTextItem, QGraphicsLineItem,
+    QGraphicsView, QGraphicsScene, QGraphicsItem, QGraphicsEllipseItem, QGraphicsTextItem, QGraphicsPathItem,
     QStackedWidget, QToolBar, QFormLayout, QRadioButton, QInputDialog, QSizePolicy
 )
-from PyQt6.QtCore import Qt, QTimer, pyqtSignal, pyqtSlot, QRectF, QSize
-from PyQt6.QtGui import QAction, QIcon, QPainter, QBrush, QPen, QColor, QFont, QTransform
+from PyQt6.QtCore import Qt, QEvent, QTimer, QThread, QObject, QMetaObject, pyqtSignal, pyqtSlot, QRectF, QSize
+from PyQt6.QtGui import QGuiApplication, QWindow, QAction, QIcon, QPainter, QPainterPath, QBrush, QPen, QColor, QFont, QFontMetricsF, QTransform
 
 # Usar importaciones absolutas en lugar de relativas
 from ui.views.network_view import NetworkView
@@ -37,6 +41,48 @@ from ui.widgets.segment_edit_dialog import SegmentEditDialog
 from ui.views.fiber_history_view import FiberHistoryView
 logger = logging.getLogger(__name__)
 
+# Orden de circuitos de la vista simplificada del anillo
+try:
+    from model.network_model import DEFAULT_RING_ORDER
+except ImportError:
+    DEFAULT_RING_ORDER = None
+
+def _scene_attribute(view):
+    """Escena de una vista que la guarda como atributo 'scene' (o None)."""
+    return getattr(view, 'scene', None)
+
+@lru_cache(maxsize=16)
+def _ring_trig_table(n):
+    """Devuelve (cos, sin) de los n ángulos equiespaciados de la vista del anillo."""
+    step = math.tau / n
+    return tuple((math.cos(i * step), math.sin(i * step)) for i in range(n))
+
+class NetworkStatusWorker(QObject):
+    """Calcula el estado de la red fuera del hilo de la interfaz.
+    
+    Vive en un QThread propio; request() se invoca en cola desde la ventana
+    principal y el resultado se entrega con la señal finished.
+    """
+    
+    # Señal emitida con el diccionario devuelto por get_network_status
+    finished = pyqtSignal(dict)
+    # Señal emitida con el mensaje de error si el cálculo falla
+    failed = pyqtSignal(str)
+    
+    def __init__(self, model):
+        super().__init__()
+        self.model = model
+    
+    @pyqtSlot()
+    def request(self):
+        """Obtiene el estado de la red y lo emite."""
+        try:
+            self.finished.emit(self.model.get_network_status())
+        except RecursionError:
+            self.failed.emit("RecursionError")
+        except Exception as e:
+            self.failed.emit(str(e))
+
 class MainWindow(QMainWindow):
     """
     Ventana principal de la aplicación Fiber Hybrid.
@@ -47,31 +93,70 @@ class MainWindow(QMainWindow):
     # Señal emitida cuando la planta activa cambia
     plant_changed = pyqtSignal(str)
     
+    # Intervalo de actualización periódica del estado (ms): normal y con la ventana minimizada
+    UPDATE_INTERVAL_MS = 5000
+    MINIMIZED_UPDATE_INTERVAL_MS = 30000
+    
+    # Estilo del panel de notificaciones según nivel
+    # Icono de tema para cada nivel de notificación
+    _NOTIFICATION_ICONS = {
+        'info': "dialog-information",
+        'success': "dialog-information",
+        'warning': "dialog-warning",
+        'error': "dialog-error"
+    }
+    _NOTIFICATION_STYLES = {
+        'info': "background-color: #e0f2fe; border: 1px solid #0284c7;",
+        'success': "background-color: #dcfce7; border: 1px solid #16a34a;",
+        'warning': "background-color: #fef9c3; border: 1px solid #ca8a04;",
+        'error': "background-color: #fee2e2; border: 1px solid #dc2626;"
+    }
+    
     def __init__(self, model):
         super().__init__()
         self.model = model
         self.selected_segment_id = None
         self.current_status_data = None
         self.update_timer = None
+        self.status_thread = None
+        self.status_worker = None
+        self._status_request_pending = False  # Hay un cálculo de estado en curso
+        self._status_request_queued = False   # Se pidió otro cálculo mientras tanto
+        self._last_rendered_revision = None   # Revisión del modelo mostrada en la interfaz
+        self._last_error_sig = None  # Último error de actualización registrado
+        self._deferred_update = False  # update_ui omitida con la ventana no visible
+        self._pending_error = None  # (diálogo, título, mensaje) del error de actualización por mostrar
+        # (planta, revisión) -> (segmentos, estadísticas de fibras, estado del anillo)
+        self._stats_cache = {}
+        
+        # Elementos de la vista simplificada del anillo (se crean una vez y se reutilizan)
+        self._ring_scene_built = False
+        self._ring_order_hash = None
+        self._ring_node_items = {}
+        self._ring_line_coords = {}  # 'Cx-Cy' -> (x1, y1, x2, y2) de la conexión
+        self._ring_line_status = {}
+        self._ok_path_item = None     # Todas las conexiones OK en un solo trazado
+        self._fault_path_item = None  # Todas las conexiones fallidas en un solo trazado
+        self._ok_pen = QPen(QColor("#16a34a"), 2)      # Verde para conexiones OK
+        self._fault_pen = QPen(QColor("#dc2626"), 2)   # Rojo para conexiones fallidas
+        self._fault_pen.setStyle(Qt.PenStyle.DashLine)
         self.current_plant_id = self.model.active_plant_id
         self.current_plant_name = "Default"  # Placeholder, se cargará desde el modelo
         self.has_unsaved_changes = False  # Indicador de cambios sin guardar
         
         # Store view instances
+        # (las demás vistas se construyen al seleccionarlas; ver cctv_view, etc.)
         self.fiber_ring_view = None  # Vista de anillo de fibra
-        self.cctv_view = None        # Vista CCTV (placeholder)
-        self.gps_map_view = None     # Vista GPS (placeholder)
-        self.layout_view = None      # Vista Layout (placeholder)
-        self.fiber_history_view = None  # Vista Historial de Fibras
         
         self._init_ui()
         self._setup_menu()
         self._setup_toolbar()  # Barra de herramientas para selector de planta
         self._setup_connections()
         
-        # Carga inicial de datos y actualización de UI
-        self.load_initial_data()
+        # Carga inicial de datos y actualización de UI (el worker de estado
+        # se crea con el temporizador y debe existir antes de la carga)
         self._start_update_timer()
+        self.load_initial_data()
     
     def _init_ui(self):
         """Inicializa la interfaz de usuario principal."""
@@ -104,15 +189,23 @@ class MainWindow(QMainWindow):
         # --- Panel Central (ViewManager) ---
         self.view_manager = ViewManager()
         self.fiber_ring_view = NetworkView(self.model)
-        self.cctv_view = CCTVView()
-        self.gps_map_view = GPSView()
-        self.layout_view = LayoutView()
-        self.fiber_history_view = FiberHistoryView(self.model)
         self.view_manager.add_view("Anillo Fibra Óptica", self.fiber_ring_view, "fiber")
-        self.view_manager.add_view("Anillo CCTV", self.cctv_view, "cctv")
-        self.view_manager.add_view("Mapa GPS", self.gps_map_view, "gps")
-        self.view_manager.add_view("Layout Topográfico", self.layout_view, "layout")
-        self.view_manager.add_view("Historial de Fibras", self.fiber_history_view, "fiber_history")
+        # Vistas secundarias: se construyen la primera vez que se seleccionan
+        self.view_manager.add_view_factory("Anillo CCTV", lambda: self.cctv_view, "cctv")
+        self.view_manager.add_view_factory("Mapa GPS", lambda: self.gps_map_view, "gps")
+        self.view_manager.add_view_factory("Layout Topográfico", lambda: self.layout_view, "layout")
+        self.view_manager.add_view_factory("Historial de Fibras", lambda: self.fiber_history_view, "fiber_history")
+        
+        # Cómo restablecer cada tipo de vista (reset_active_view recorre el MRO del widget)
+        self._reset_dispatch = {
+            QGraphicsView: self._fit_graphics_view,
+            CCTVView: CCTVView.reset_view,
+            LayoutView: LayoutView.reset_view,
+            FiberHistoryView: FiberHistoryView.reset_view,
+            QLabel: lambda widget: None,
+        }
+        self._reset_unsupported = set()  # Tipos sin manejador ya advertidos en el log
+        self._scene_of = WeakKeyDictionary()  # Vista -> función que devuelve su escena
         
         # Panel inferior central (estado/sugerencias)
         self.status_panel = StatusPanel()
@@ -158,7 +251,13 @@ class MainWindow(QMainWindow):
         self.notification_frame.setMaximumHeight(80)
         
         notification_layout = QHBoxLayout(self.notification_frame)  # QHBoxLayout para icono + texto
-        self.notification_icon_label = QLabel()  # Placeholder para icono
+        self.notification_icon_label = QLabel()  # Icono según nivel
+        # Pixmaps de los iconos creados una vez; el estilo solo se reaplica al cambiar de nivel
+        self._notification_pixmaps = {
+            level: QIcon.fromTheme(icon_name).pixmap(16, 16)
+            for level, icon_name in self._NOTIFICATION_ICONS.items()
+        }
+        self._notification_level = None
         self.notification_label = QLabel("")
         notification_layout.addWidget(self.notification_icon_label)
         notification_layout.addWidget(self.notification_label, 1)  # Estirar etiqueta
@@ -232,13 +331,7 @@ class MainWindow(QMainWindow):
             
             # Acción Historial de Fibras
             fiber_history_action = QAction("Historial de Fibras", self)
-            # Buscar el índice de la vista 'fiber_history' en el ViewManager
-            def get_view_index_by_key(key):
-                for i in range(self.view_manager.combo.count()):
-                    if self.view_manager.combo.itemData(i) == key:
-                        return i
-                return -1
-            fiber_history_action.triggered.connect(lambda: self.view_manager.set_current_index(get_view_index_by_key("fiber_history")))
+            fiber_history_action.triggered.connect(lambda: self.view_manager.set_current_index(self._view_index_by_key.get("fiber_history", -1)))
             view_menu.addAction(fiber_history_action)
         
         # Menú Herramientas
@@ -259,6 +352,40 @@ class MainWindow(QMainWindow):
             about_action.triggered.connect(self.show_about)
             help_menu.addAction(about_action)
     
+    @cached_property
+    def cctv_view(self):
+        """Vista CCTV (placeholder), construida en el primer acceso."""
+        return CCTVView()
+    
+    @cached_property
+    def gps_map_view(self):
+        """Vista GPS (placeholder), construida en el primer acceso."""
+        return GPSView()
+    
+    @cached_property
+    def layout_view(self):
+        """Vista Layout (placeholder), construida en el primer acceso."""
+        return LayoutView()
+    
+    @cached_property
+    def fiber_history_view(self):
+        """Vista Historial de Fibras, construida en el primer acceso."""
+        return FiberHistoryView(self.model)
+    
+    @cached_property
+    def _view_index_by_key(self):
+        """Índice de cada vista del ViewManager por su clave (p.ej. 'fiber_history')."""
+        combo = self.view_manager.combo
+        return {combo.itemData(i): i for i in range(combo.count())}
+    
+    @cached_property
+    def circuit_order(self):
+        """Orden de circuitos de la vista simplificada del anillo."""
+        if DEFAULT_RING_ORDER is None:
+            logger.warning("No se pudo importar DEFAULT_RING_ORDER, usando valores por defecto")
+            return ["C1", "C2", "C3", "C4", "C5", "C6", "C7", "C8"]
+        return DEFAULT_RING_ORDER
+    
     def _setup_toolbar(self):
         """Configura la barra de herramientas con selector de planta."""
         toolbar = QToolBar("Plantas")
@@ -322,12 +449,6 @@ class MainWindow(QMainWindow):
         # Selector de Vista
         self.view_manager.view_changed.connect(self.on_view_changed)
 
-        # Selector de Planta
-        self.plant_selector_combo.currentIndexChanged.connect(self.on_plant_changed)
-
-        # Cambio de planta (custom signal)
-        self.plant_changed.connect(self.handle_plant_change)
-
         # Conexiones del panel de Sandbox
         self.sandbox_panel.simulate_failure.connect(self._simulate_failure)
         self.sandbox_panel.restore_selected_segment.connect(self._restore_selected_segment_fibers)
@@ -336,120 +457,271 @@ class MainWindow(QMainWindow):
     
     def _start_update_timer(self):
         """Inicia el temporizador para actualizaciones periódicas."""
+        if not self.status_thread:
+            # Worker en su propio hilo para no bloquear la interfaz con el cálculo
+            self.status_thread = QThread(self)
+            self.status_worker = NetworkStatusWorker(self.model)
+            self.status_worker.moveToThread(self.status_thread)
+            self.status_worker.finished.connect(self.on_network_status_ready)
+            self.status_worker.failed.connect(self.on_network_status_failed)
+            self.status_thread.finished.connect(self.status_worker.deleteLater)
+            self.status_thread.start()
+        
         if not self.update_timer:
+            # Temporizador de un solo disparo: se rearma al completar cada actualización,
+            # de modo que nunca hay más de una en curso ni ticks acumulados
             self.update_timer = QTimer(self)
-            self.update_timer.timeout.connect(self.update_network_status)
-            self.update_timer.start(5000)  # Actualización cada 5 segundos
+            self.update_timer.setSingleShot(True)
+            self.update_timer.timeout.connect(self._on_update_tick, Qt.ConnectionType.QueuedConnection)
+            self.update_timer.start(self._update_interval())
+    
+    def _on_update_tick(self):
+        """Actualización periódica: pide el estado o, si no hace falta, rearma el temporizador."""
+        self.update_network_status()
+        if not self._status_request_pending:
+            self._restart_update_timer()
+    
+    def _restart_update_timer(self):
+        """Rearma el temporizador de actualización si la ventana sigue activa."""
+        if self.update_timer and self.isVisible() and self.status_worker is not None:
+            self.update_timer.start(self._update_interval())
+    
+    def _update_interval(self):
+        """Intervalo del temporizador de actualización según el estado de la ventana."""
+        if self.isMinimized():
+            return self.MINIMIZED_UPDATE_INTERVAL_MS
+        return self.UPDATE_INTERVAL_MS
+    
+    def changeEvent(self, event):
+        """Ralentiza las actualizaciones periódicas mientras la ventana está minimizada."""
+        if event.type() == QEvent.Type.WindowStateChange:
+            if self.update_timer and self.update_timer.isActive():
+                self.update_timer.setInterval(self._update_interval())
+            if self._deferred_update and not self.isMinimized():
+                # Se omitió una actualización mientras estaba minimizada
+                QTimer.singleShot(0, self.update_network_status)
+        super().changeEvent(event)
+    
+    def hideEvent(self, event):
+        """Detiene las actualizaciones periódicas mientras la ventana no es visible."""
+        if self.update_timer:
+            self.update_timer.stop()
+        super().hideEvent(event)
+    
+    def showEvent(self, event):
+        """Reanuda las actualizaciones periódicas y refresca el estado al mostrarse."""
+        super().showEvent(event)
+        if self.update_timer and not self.update_timer.isActive():
+            self.update_timer.start(self._update_interval())
+            QTimer.singleShot(0, self.update_network_status)
+        elif self._deferred_update:
+            QTimer.singleShot(0, self.update_network_status)
+    
+    def _is_visible_for_updates(self):
+        """Indica si la ventana se ve en pantalla y merece la pena actualizar la interfaz.
+        
+        Qt no informa de si otra aplicación tapa la ventana: se consideran no
+        visibles la ventana oculta o minimizada y la aplicación oculta o suspendida.
+        """
+        window = self.windowHandle()
+        if window is None or window.visibility() in (QWindow.Visibility.Hidden, QWindow.Visibility.Minimized):
+            return False
+        return QGuiApplication.applicationState() not in (
+            Qt.ApplicationState.ApplicationHidden, Qt.ApplicationState.ApplicationSuspended
+        )
     
     def reset_active_view(self):
         """Restablece el zoom y la posición de la vista activa."""
         active_widget = self.view_manager.current_widget()
 
-        if isinstance(active_widget, QGraphicsView):
-            # Verificar si scene es un método o una propiedad
-            if hasattr(active_widget, 'scene'):
-                if callable(active_widget.scene):
-                    scene = active_widget.scene()
-                else:
-                    scene = active_widget.scene
-            else:
-                scene = None
-                
-            if scene is not None and hasattr(scene, 'items'):
-                try:
-                    # Limitar el tiempo para esta operación
-                    items = scene.items()
-                    if items:
-                        if hasattr(scene, 'itemsBoundingRect'):
-                            items_rect = scene.itemsBoundingRect()
-                            if items_rect is not None and not items_rect.isNull():
-                                padding = 30
-                                adjusted_rect = items_rect.adjusted(-padding, -padding, padding, padding)
-                                active_widget.fitInView(adjusted_rect, Qt.AspectRatioMode.KeepAspectRatio)
-                            else:
-                                active_widget.fitInView(scene.sceneRect(), Qt.AspectRatioMode.KeepAspectRatio)
-                        else:
-                            active_widget.fitInView(scene.sceneRect(), Qt.AspectRatioMode.KeepAspectRatio)
-                except Exception as e:
-                    logger.error(f"Error al restablecer vista: {e}")
-                    active_widget.resetTransform()  # Reset más simple si falla el fitInView
-        elif hasattr(active_widget, 'reset_view') and callable(getattr(active_widget, 'reset_view', None)):
-            active_widget.reset_view()  # type: ignore[attr-defined]
-        elif isinstance(active_widget, QLabel):
-            pass
+        # Primer manejador registrado en la jerarquía de clases del widget
+        for cls in type(active_widget).__mro__:
+            reset = self._reset_dispatch.get(cls)
+            if reset is not None:
+                reset(active_widget)
+                break
         else:
-            logger.warning(f"No se pudo restablecer la vista para el widget tipo: {type(active_widget)}")
+            widget_type = type(active_widget)
+            if widget_type not in self._reset_unsupported:
+                self._reset_unsupported.add(widget_type)
+                logger.warning(f"No se pudo restablecer la vista para el widget tipo: {widget_type}")
             self.show_notification("No se puede restablecer esta vista.", level='info')
 
-        # También aplicamos la misma corrección para el ring_canvas
+        # También se ajusta la vista simplificada del anillo
         ring_canvas = getattr(self.ring_status_widget, 'ring_view_canvas', None)
-        if ring_canvas is not None and isinstance(ring_canvas, QGraphicsView):
-            # Verificar si scene es un método o una propiedad
-            if hasattr(ring_canvas, 'scene'):
-                if callable(ring_canvas.scene):
-                    scene = ring_canvas.scene()
-                else:
-                    scene = ring_canvas.scene
+        if isinstance(ring_canvas, QGraphicsView):
+            self._fit_graphics_view(ring_canvas)
+
+    def _get_scene(self, view):
+        """Devuelve la escena de una vista resolviendo una sola vez cómo obtenerla.
+        
+        Algunas vistas guardan la escena en un atributo 'scene' en lugar del método;
+        el acceso resuelto se memoriza por vista.
+        
+        Args:
+            view: Vista gráfica
+            
+        Returns:
+            QGraphicsScene o None
+        """
+        accessor = self._scene_of.get(view)
+        if accessor is None:
+            # Funciones sin referencia a la vista: el valor no debe mantener viva la clave
+            if callable(getattr(view, 'scene', None)):
+                accessor = methodcaller('scene')
             else:
-                scene = None
-                
-            if scene is not None and hasattr(scene, 'items'):
-                try:
-                    items = scene.items()
-                    if items:
-                        if hasattr(scene, 'itemsBoundingRect'):
-                            items_rect = scene.itemsBoundingRect()
-                            if items_rect is not None and not items_rect.isNull():
-                                padding = 30
-                                adjusted_rect = items_rect.adjusted(-padding, -padding, padding, padding)
-                                ring_canvas.fitInView(adjusted_rect, Qt.AspectRatioMode.KeepAspectRatio)
-                            else:
-                                ring_canvas.fitInView(scene.sceneRect(), Qt.AspectRatioMode.KeepAspectRatio)
-                        else:
-                            ring_canvas.fitInView(scene.sceneRect(), Qt.AspectRatioMode.KeepAspectRatio)
-                except Exception as e:
-                    logger.error(f"Error al restablecer vista del anillo: {e}")
-                    ring_canvas.resetTransform()  # Reset más simple si falla el fitInView
+                accessor = _scene_attribute
+            self._scene_of[view] = accessor
+        return accessor(view)
+    
+    def _fit_graphics_view(self, view, padding=30):
+        """Ajusta una QGraphicsView para mostrar todos los elementos de su escena.
+        
+        Args:
+            view: Vista a ajustar
+            padding: Margen alrededor de los elementos (unidades de escena)
+        """
+        scene = self._get_scene(view)
+        if scene is None:
+            return
+        try:
+            if not scene.items():
+                return
+            rect = scene.itemsBoundingRect()
+            if rect.isNull():
+                view.fitInView(scene.sceneRect(), Qt.AspectRatioMode.KeepAspectRatio)
+            else:
+                view.fitInView(rect.adjusted(-padding, -padding, padding, padding), Qt.AspectRatioMode.KeepAspectRatio)
+        except Exception as e:
+            logger.error(f"Error al restablecer vista: {e}")
+            view.resetTransform()  # Reset más simple si falla el fitInView
 
     def update_network_status(self):
-        if getattr(self, '_updating_network_status', False):
+        """Solicita al worker el estado de la red; update_ui se ejecuta al recibirlo."""
+        if self.status_worker is None:
+            return
+        if self.model.revision == self._last_rendered_revision:
+            # El modelo no ha cambiado desde la última actualización mostrada
+            return
+        if self._status_request_pending:
+            # El resultado en curso puede no reflejar el último cambio: repetir al terminar
+            self._status_request_queued = True
             return
-        self._updating_network_status = True
+        self._status_request_pending = True
+        QMetaObject.invokeMethod(self.status_worker, "request", Qt.ConnectionType.QueuedConnection)
+    
+    def _finish_status_request(self):
+        """Libera la petición en curso y lanza la que quedó en cola, si la hay.
+        
+        Returns:
+            bool: True si el resultado actual debe descartarse (ventana cerrada
+                o nueva petición lanzada)
+        """
+        self._status_request_pending = False
+        if self.status_worker is None:
+            return True
+        if self._status_request_queued:
+            self._status_request_queued = False
+            self.update_network_status()
+            if self._status_request_pending:
+                return True
+        # Nada en curso: contar el siguiente intervalo desde ahora
+        self._restart_update_timer()
+        return False
+    
+    @pyqtSlot(dict)
+    def on_network_status_ready(self, status_data):
+        """Recibe el estado de la red calculado por el worker y actualiza la interfaz."""
+        if self._finish_status_request():
+            return
+        self.current_status_data = status_data
         try:
-            """Actualiza el estado de la red y la interfaz."""
-            try:
-                self.current_status_data = self.model.get_network_status()
-                # Si el modelo devolvió un error, no intentes actualizar la UI
-                if (
-                    not self.current_status_data
-                    or not isinstance(self.current_status_data, dict)
-                    or not self.current_status_data.get('segment_statuses')
-                    or "RecursionError" in str(self.current_status_data.get('suggestions', ''))
-                ):
-                    print("\n[ERROR ACTUALIZANDO ESTADO DE RED] RecursionError: El grafo es demasiado profundo o está corrupto.")
-                    QMessageBox.critical(
-                        self,
-                        "Error",
-                        "Error de recursión: El grafo de red es demasiado profundo o está corrupto.\nRevise la configuración de la red."
-                    )
-                    return
-                self.update_ui()
-            except RecursionError:
-                print("\n[ERROR ACTUALIZANDO ESTADO DE RED] RecursionError: El grafo es demasiado profundo o está corrupto.")
-                # No QMessageBox ni logging aquí para evitar más recursión
-                return
-            except Exception as e:
-                print("\n[ERROR ACTUALIZANDO ESTADO DE RED]", e)
-                QMessageBox.critical(
-                    self,
-                    "Error",
-                    f"Error actualizando estado de red: {e}"
+            # Si el modelo devolvió un error, no intentes actualizar la UI
+            if (
+                not self.current_status_data
+                or not isinstance(self.current_status_data, dict)
+                or not self.current_status_data.get('segment_statuses')
+                or "RecursionError" in str(self.current_status_data.get('suggestions', ''))
+            ):
+                self._log_status_error("Error actualizando estado de red: RecursionError: El grafo es demasiado profundo o está corrupto.")
+                self._report_network_error(
+                    "Error de recursión: El grafo de red es demasiado profundo o está corrupto.\nRevise la configuración de la red."
                 )
-        finally:
-            self._updating_network_status = False
+                return
+            self.update_ui()
+            if not self._deferred_update:
+                self._last_rendered_revision = status_data.get('revision')
+            self._last_error_sig = None
+        except RecursionError:
+            # Sin traza ni QMessageBox aquí para evitar más recursión
+            self._log_status_error("Error actualizando estado de red: RecursionError: El grafo es demasiado profundo o está corrupto.")
+            return
+        except Exception as e:
+            self._log_status_error(f"Error actualizando estado de red: {e}", exc_info=True)
+            self._report_network_error(f"Error actualizando estado de red: {e}")
+    
+    @pyqtSlot(str)
+    def on_network_status_failed(self, error):
+        """Informa de un fallo del worker al calcular el estado de la red."""
+        if self._finish_status_request():
+            return
+        self._log_status_error(f"Error actualizando estado de red: {error}")
+        if error == "RecursionError":
+            # No QMessageBox aquí para evitar más recursión
+            return
+        self._report_network_error(f"Error actualizando estado de red: {error}")
+    
+    def _log_status_error(self, message, exc_info=False):
+        """Registra un error de actualización sin repetir el mismo error en cada ciclo.
+        
+        Args:
+            message: Texto del error
+            exc_info: Incluir la traza de la excepción en curso
+        """
+        if message == self._last_error_sig:
+            return
+        self._last_error_sig = message
+        logger.error(message, exc_info=exc_info)
+    
+    def _report_network_error(self, message, title="Error", dialog=None):
+        """Programa el aviso de un error de actualización fuera del slot actual.
+        
+        El diálogo modal abre su propio bucle de eventos: mostrarlo dentro del
+        slot permitiría nuevas actualizaciones (y nuevos errores) mientras está
+        abierto. Se detiene el temporizador y el diálogo se muestra cuando el
+        evento actual termina; solo se mantiene un aviso pendiente.
+        
+        Args:
+            message: Texto del error
+            title: Título del diálogo
+            dialog: Función de QMessageBox que muestra el aviso (por defecto, critical)
+        """
+        if self.update_timer:
+            self.update_timer.stop()
+        if self._pending_error is not None:
+            return
+        self._pending_error = (dialog, title, message)
+        QTimer.singleShot(0, self._show_network_error)
+    
+    def _show_network_error(self):
+        """Muestra el error pendiente y reanuda las actualizaciones al cerrarlo."""
+        pending, self._pending_error = self._pending_error, None
+        if pending is None:
+            return
+        dialog, title, message = pending
+        (dialog or QMessageBox.critical)(self, title, message)
+        self._restart_update_timer()
     
     def update_ui(self):
-        """Actualiza todos los elementos de la interfaz con los datos actuales."""
+        """Actualiza todos los elementos de la interfaz con los datos actuales.
+        
+        Con la ventana no visible no se actualiza nada; la actualización se
+        repite al volver a mostrarse.
+        """
+        if not self._is_visible_for_updates():
+            self._deferred_update = True
+            return
+        self._deferred_update = False
         try:
             # Si el modelo devolvió un error, no intentes actualizar la UI
             if (
@@ -468,15 +740,16 @@ class MainWindow(QMainWindow):
                     self.get_segment_data(self.selected_segment_id)
                 )
         except RecursionError:
-            print("[ERROR] RecursionError: El grafo es demasiado profundo o está corrupto (update_ui).")
-            QMessageBox.critical(
-                self,
-                "Error",
+            self._log_status_error("Error actualizando la UI: RecursionError: El grafo es demasiado profundo o está corrupto.")
+            self._report_network_error(
                 "Error de recursión: El grafo de red es demasiado profundo o está corrupto.\nRevise la configuración de la red."
             )
         except Exception as e:
-            print(f"[ERROR] Error actualizando la UI: {e}")
-            QMessageBox.warning(self, "Error en la Interfaz", f"Ocurrió un error actualizando la interfaz: {e}")
+            self._log_status_error(f"Error actualizando la UI: {e}", exc_info=True)
+            self._report_network_error(
+                f"Ocurrió un error actualizando la interfaz: {e}",
+                title="Error en la Interfaz", dialog=QMessageBox.warning
+            )
 
     def update_segment_list(self):
         """Actualiza la lista de segmentos con los datos actuales."""
@@ -497,16 +770,16 @@ class MainWindow(QMainWindow):
         if not self.current_status_data:
             return
         
-        # Contar estados de CT
+        # Contar estados de CT (una sola pasada)
         ct_statuses = self.current_status_data.get('ct_connectivity', {})
-        connected = sum(1 for status in ct_statuses.values() if status == 'conectado')
-        isolated = sum(1 for status in ct_statuses.values() if status == 'aislado')
-        error = sum(1 for status in ct_statuses.values() if status == 'error')
-        self.statistics_panel.update_ct_stats(connected, isolated, error)
+        ct_counts = Counter(ct_statuses.values())
+        self.statistics_panel.update_ct_stats(
+            ct_counts.get('conectado', 0), ct_counts.get('aislado', 0), ct_counts.get('error', 0)
+        )
         
         # Obtener estadísticas de fibras
         segments = self.current_status_data.get('segment_statuses', []) if self.current_status_data else []
-        fiber_stats = self.model.get_fiber_statistics(segments)
+        fiber_stats, ring_status = self._cached_statistics(segments)
         
         # Actualizar estadísticas de fibras
         comm_ok = fiber_stats.get('comm_ok', 0)
@@ -519,14 +792,13 @@ class MainWindow(QMainWindow):
         
         # Verificar integridad del anillo
         try:
-            ring_status = self.model._check_ring_integrity()
             all_ok = all(ring_status.values())
             
             if all_ok:
                 self.ring_status_widget.status_label.setText("Estado: ✅ Anillo completo")
                 self.ring_status_widget.status_label.setStyleSheet("color: #16a34a;")
             else:
-                broken_count = sum(1 for status in ring_status.values() if not status)
+                broken_count = len(ring_status) - sum(ring_status.values())
                 total_count = len(ring_status)
                 self.ring_status_widget.status_label.setText(f"Estado: ⚠️ Anillo incompleto ({broken_count}/{total_count} fallos)")
                 self.ring_status_widget.status_label.setStyleSheet("color: #f97316;")
@@ -538,107 +810,49 @@ class MainWindow(QMainWindow):
             self.ring_status_widget.status_label.setText(f"Estado: ❌ Error verificando anillo")
             self.ring_status_widget.status_label.setStyleSheet("color: #dc2626;")
     
+    def _cached_statistics(self, segments):
+        """Estadísticas de fibras e integridad del anillo, calculadas una vez por revisión.
+        
+        Args:
+            segments: Lista de segmentos del estado mostrado
+            
+        Returns:
+            tuple: (estadísticas de fibras, estado del anillo)
+        """
+        key = (self.current_plant_id, self.model.revision)
+        cached = self._stats_cache.get(key)
+        if cached is None or cached[0] is not segments:
+            cached = (segments, self.model.get_fiber_statistics(segments), self.model._check_ring_integrity())
+            self._stats_cache[key] = cached
+            # Conservar solo las últimas revisiones
+            while len(self._stats_cache) > 4:
+                del self._stats_cache[next(iter(self._stats_cache))]
+        return cached[1], cached[2]
+    
     def update_ring_visualization(self, ring_status):
-        """Actualiza la visualización circular del anillo con el estado actual."""
+        """Actualiza la visualización circular del anillo con el estado actual.
+        
+        Los nodos, etiquetas y líneas se crean una sola vez (o al cambiar el orden
+        de circuitos); en cada actualización solo se cambia el trazo de las
+        conexiones cuyo estado ha variado.
+        """
         try:
             widget = self.ring_status_widget
-            if not hasattr(widget, 'ring_view_canvas') or not ring_status:
+            if not ring_status:
                 return
-            scene = widget.ring_view_canvas.scene() if hasattr(widget.ring_view_canvas, 'scene') else None
+            scene = self._get_scene(widget.ring_view_canvas)
             if scene is None:
                 return
-            if hasattr(scene, 'clear'):
-                scene.clear()
-            
-            # Configurar escena
-            center_x = 0
-            center_y = 0
-            radius = 70
-            node_radius = 12
-            
-            # Colores
-            node_color = QColor("#3b82f6")  # Color principal de nodos
-            ok_color = QColor("#16a34a")    # Verde para conexiones OK
-            fault_color = QColor("#dc2626") # Rojo para conexiones fallidas
-            
-            # Importar correctamente DEFAULT_RING_ORDER desde el módulo network_model
-            try:
-                from model.network_model import DEFAULT_RING_ORDER as circuit_order
-            except ImportError:
-                circuit_order = ["C1", "C2", "C3", "C4", "C5", "C6", "C7", "C8"]
-                logger.warning("No se pudo importar DEFAULT_RING_ORDER, usando valores por defecto")
-            
-            if not circuit_order:
-                if hasattr(scene, 'addText'):
-                    scene.addText("No hay circuitos definidos")
-                return
-                
-            # Calcular posiciones de los nodos en círculo
-            positions = {}
-            node_items = {}
-            angle_step = 2 * 3.14159 / len(circuit_order)
-            
-            for i, circuit_id in enumerate(circuit_order):
-                angle = i * angle_step
-                pos_x = center_x + radius * math.cos(angle)
-                pos_y = center_y + radius * math.sin(angle)
-                positions[circuit_id] = (pos_x, pos_y)
-                
-                # Crear nodo
-                node = QGraphicsEllipseItem(
-                    pos_x - node_radius, 
-                    pos_y - node_radius, 
-                    node_radius * 2, 
-                    node_radius * 2
-                )
-                node.setBrush(QBrush(node_color))
-                node.setPen(QPen(QColor("#1e3a8a"), 1.5))
-                if hasattr(scene, 'addItem'):
-                    scene.addItem(node)
-                node_items[circuit_id] = node
-                
-                # Etiqueta del circuito
-                label = QGraphicsTextItem(circuit_id)
-                font = QFont("Segoe UI", 8, QFont.Weight.Bold)
-                label.setFont(font)
-                label.setDefaultTextColor(QColor("#1e293b"))
-                label_width = label.boundingRect().width()
-                label_height = label.boundingRect().height()
-                label.setPos(pos_x - label_width/2, pos_y - label_height/2)
-                if hasattr(scene, 'addItem'):
-                    scene.addItem(label)
             
-            # Dibujar conexiones entre nodos
-            for i in range(len(circuit_order)):
-                circuit_actual = circuit_order[i]
-                circuit_siguiente = circuit_order[(i + 1) % len(circuit_order)]
-                key = f"{circuit_actual}-{circuit_siguiente}"
-                
-                if key in ring_status:
-                    status_ok = ring_status[key]
-                    
-                    # Obtener posiciones
-                    x1, y1 = positions[circuit_actual]
-                    x2, y2 = positions[circuit_siguiente]
-                    
-                    # Crear línea con estado
-                    pen = QPen(ok_color if status_ok else fault_color, 2)
-                    if not status_ok:
-                        pen.setStyle(Qt.PenStyle.DashLine)
-                        
-                    line = QGraphicsLineItem(x1, y1, x2, y2)
-                    line.setPen(pen)
-                    if hasattr(scene, 'addItem'):
-                        scene.addItem(line)
-                    
-                    # Colocar línea detrás de los nodos
-                    line.setZValue(-1)
+            circuit_order = self.circuit_order
+            order_hash = hash(tuple(circuit_order))
+            if not self._ring_scene_built or order_hash != self._ring_order_hash:
+                self._build_ring_scene(scene, circuit_order)
+                self._ring_order_hash = order_hash
+                if not circuit_order:
+                    return
             
-            # Ajustar vista
-            if hasattr(scene, 'itemsBoundingRect'):
-                rect = scene.itemsBoundingRect()
-                if rect is not None and not rect.isNull():
-                    widget.ring_view_canvas.fitInView(rect, Qt.AspectRatioMode.KeepAspectRatio)
+            self._apply_ring_status(ring_status)
             
             # Actualizar texto de estado
             all_ok = all(ring_status.values())
@@ -646,7 +860,7 @@ class MainWindow(QMainWindow):
                 widget.status_label.setText("Estado: ✅ Anillo completo")
                 widget.status_label.setStyleSheet("color: #16a34a;")
             else:
-                broken_count = sum(1 for status in ring_status.values() if not status)
+                broken_count = len(ring_status) - sum(ring_status.values())
                 total_count = len(ring_status)
                 widget.status_label.setText(f"Estado: ⚠️ Anillo incompleto ({broken_count}/{total_count} fallos)")
                 widget.status_label.setStyleSheet("color: #f97316;")
@@ -664,6 +878,131 @@ class MainWindow(QMainWindow):
             logger.error(f"Error en la visualización del anillo: {e}", exc_info=True)
             QMessageBox.warning(self, "Error en Visualización", f"Ocurrió un error en la visualización del anillo: {e}")
     
+    def _build_ring_scene(self, scene, circuit_order):
+        """Crea los nodos, etiquetas y conexiones de la vista simplificada del anillo.
+        
+        Args:
+            scene: QGraphicsScene del widget de estado del anillo
+            circuit_order: Lista ordenada de identificadores de circuito
+        """
+        scene.clear()
+        # Escena solo de visualización: sin índice BSP que mantener al añadir elementos
+        scene.setItemIndexMethod(QGraphicsScene.ItemIndexMethod.NoIndex)
+        self._ring_node_items = {}
+        self._ring_line_coords = {}
+        self._ring_line_status = {}
+        self._ok_path_item = None
+        self._fault_path_item = None
+        self._ring_scene_built = True
+        
+        if not circuit_order:
+            scene.addText("No hay circuitos definidos")
+            return
+        
+        # Configurar escena
+        center_x = 0
+        center_y = 0
+        radius = 70
+        node_radius = 12
+        
+        node_brush = QBrush(QColor("#3b82f6"))  # Color principal de nodos
+        node_pen = QPen(QColor("#1e3a8a"), 1.5)
+        label_font = QFont("Segoe UI", 8, QFont.Weight.Bold)
+        label_metrics = QFontMetricsF(label_font)  # Centrar etiquetas sin maquetar cada texto
+        label_height = label_metrics.height()
+        label_color = QColor("#1e293b")
+        
+        # Calcular posiciones de los nodos en círculo
+        positions = {}
+        items = []
+        trig_table = _ring_trig_table(len(circuit_order))
+        
+        for circuit_id, (cos_a, sin_a) in zip(circuit_order, trig_table):
+            pos_x = center_x + radius * cos_a
+            pos_y = center_y + radius * sin_a
+            positions[circuit_id] = (pos_x, pos_y)
+            
+            # Crear nodo
+            node = QGraphicsEllipseItem(
+                pos_x - node_radius, 
+                pos_y - node_radius, 
+                node_radius * 2, 
+                node_radius * 2
+            )
+            node.setBrush(node_brush)
+            node.setPen(node_pen)
+            # Nodos y etiquetas no cambian entre actualizaciones: pintarlos desde caché
+            node.setCacheMode(QGraphicsItem.CacheMode.DeviceCoordinateCache)
+            items.append(node)
+            self._ring_node_items[circuit_id] = node
+            
+            # Etiqueta del circuito
+            label = QGraphicsTextItem(circuit_id)
+            label.setFont(label_font)
+            label.setDefaultTextColor(label_color)
+            label_width = label_metrics.horizontalAdvance(circuit_id)
+            # El texto empieza tras el margen del documento de la etiqueta
+            margin = label.document().documentMargin()
+            label.setPos(pos_x - label_width/2 - margin, pos_y - label_height/2 - margin)
+            label.setCacheMode(QGraphicsItem.CacheMode.DeviceCoordinateCache)
+            items.append(label)
+        
+        # Conexiones entre nodos consecutivos: un trazado por estado (vacíos hasta
+        # conocer el estado de cada conexión)
+        for i in range(len(circuit_order)):
+            circuit_actual = circuit_order[i]
+            circuit_siguiente = circuit_order[(i + 1) % len(circuit_order)]
+            self._ring_line_coords[f"{circuit_actual}-{circuit_siguiente}"] = (
+                *positions[circuit_actual], *positions[circuit_siguiente]
+            )
+        self._ok_path_item = QGraphicsPathItem()
+        self._ok_path_item.setPen(self._ok_pen)
+        self._fault_path_item = QGraphicsPathItem()
+        self._fault_path_item.setPen(self._fault_pen)
+        for path_item in (self._ok_path_item, self._fault_path_item):
+            # Colocar conexiones detrás de los nodos
+            path_item.setZValue(-1)
+            items.append(path_item)
+        
+        # Añadir todos los elementos de una vez, sin notificar cada alta
+        scene.blockSignals(True)
+        try:
+            for item in items:
+                scene.addItem(item)
+        finally:
+            scene.blockSignals(False)
+        
+        # Ajustar vista
+        rect = scene.itemsBoundingRect()
+        if rect is not None and not rect.isNull():
+            self.ring_status_widget.ring_view_canvas.fitInView(rect, Qt.AspectRatioMode.KeepAspectRatio)
+    
+    def _apply_ring_status(self, ring_status):
+        """Aplica el estado de las conexiones a los trazados OK/fallo del anillo.
+        
+        Los dos trazados solo se reconstruyen si ha cambiado el estado de alguna conexión.
+        
+        Args:
+            ring_status: Diccionario {'Cx-Cy': bool} devuelto por _check_ring_integrity
+        """
+        line_status = {key: ring_status.get(key) for key in self._ring_line_coords}
+        if line_status == self._ring_line_status or self._ok_path_item is None:
+            return
+        self._ring_line_status = line_status
+        
+        ok_path = QPainterPath()
+        fault_path = QPainterPath()
+        for key, (x1, y1, x2, y2) in self._ring_line_coords.items():
+            status_ok = line_status[key]
+            if status_ok is None:
+                # Conexión sin estado conocido: no se dibuja
+                continue
+            path = ok_path if status_ok else fault_path
+            path.moveTo(x1, y1)
+            path.lineTo(x2, y2)
+        self._ok_path_item.setPath(ok_path)
+        self._fault_path_item.setPath(fault_path)
+    
     def show_notification(self, message, level='info', duration=3000):
         """Muestra una notificación temporal.
         
@@ -673,14 +1012,12 @@ class MainWindow(QMainWindow):
             duration: Duración en milisegundos
         """
         # Configurar estilo según nivel
-        style = {
-            'info': "background-color: #e0f2fe; border: 1px solid #0284c7;",
-            'success': "background-color: #dcfce7; border: 1px solid #16a34a;",
-            'warning': "background-color: #fef9c3; border: 1px solid #ca8a04;",
-            'error': "background-color: #fee2e2; border: 1px solid #dc2626;"
-        }
-        
-        self.notification_frame.setStyleSheet(style.get(level, style['info']))
+        if level not in self._NOTIFICATION_STYLES:
+            level = 'info'
+        if level != self._notification_level:
+            self.notification_frame.setStyleSheet(self._NOTIFICATION_STYLES[level])
+            self.notification_icon_label.setPixmap(self._notification_pixmaps[level])
+            self._notification_level = level
         self.notification_label.setText(message)
         self.notification_frame.setVisible(True)
         
@@ -952,8 +1289,15 @@ class MainWindow(QMainWindow):
         if self.update_timer:
             self.update_timer.stop()
         
-        # Cerrar conexión a la base de datos
+        # Detener el hilo del worker de estado (espera al cálculo en curso)
+        if self.status_thread:
+            self.status_thread.quit()
+            self.status_thread.wait()
+            self.status_worker = None
+        
+        # Completar los guardados pendientes y cerrar conexión a la base de datos
         if self.model.storage:
+            self.model.wait_for_saves()
             self.model.storage.close()
         
         # Aceptar cierre
@@ -1016,7 +1360,7 @@ class MainWindow(QMainWindow):
         
         # Obtener segmentos disponibles
         if not self.current_status_data:
-            self.update_network_status()
+            self.current_status_data = self.model.get_network_status()
         
         segments = self.current_status_data.get('segment_statuses', []) # type: ignore
         
@@ -1053,7 +1397,7 @@ class MainWindow(QMainWindow):
     def _restore_all_segments(self):
         """Restaura todas las fibras de todos los segmentos a estado OK."""
         if not self.current_status_data:
-            self.update_network_status()
+            self.current_status_data = self.model.get_network_status()
         
         segments = self.current_status_data.get('segment_statuses', []) # type: ignore
         
@@ -1379,29 +1723,33 @@ class MainWindow(QMainWindow):
         # Guardar selección actual
         current_selection = self.plant_selector_combo.currentData()
         
-        # Limpiar y rellenar combo
-        self.plant_selector_combo.clear()
-        
         # Obtener plantas disponibles
         plants = self.model.get_available_plants()
         if "Olmedilla" in plants:
             plants.remove("Olmedilla")
         
-        # Si no hay plantas, añadir una por defecto
-        if not plants:
-            self.plant_selector_combo.addItem("Default", "default")
-            return
-        
-        # Añadir plantas
-        selected_index = 0
-        for i, plant_id in enumerate(sorted(plants)):
-            self.plant_selector_combo.addItem(plant_id, plant_id)
-            if plant_id == current_selection or plant_id == self.model.active_plant_id:
-                selected_index = i
-                
-        # Si hay plantas, seleccionar la última activa
-        if self.plant_selector_combo.count() > 0:
+        # Limpiar y rellenar combo sin emitir currentIndexChanged por cada
+        # elemento (cada emisión podría provocar un cambio de planta)
+        self.plant_selector_combo.blockSignals(True)
+        try:
+            self.plant_selector_combo.clear()
+            
+            # Si no hay plantas, añadir una por defecto
+            if not plants:
+                self.plant_selector_combo.addItem("Default", "default")
+                return
+            
+            # Añadir plantas
+            selected_index = 0
+            for i, plant_id in enumerate(sorted(plants)):
+                self.plant_selector_combo.addItem(plant_id, plant_id)
+                if plant_id == current_selection or plant_id == self.model.active_plant_id:
+                    selected_index = i
+                    
+            # Seleccionar la última activa
             self.plant_selector_combo.setCurrentIndex(selected_index)
+        finally:
+            self.plant_selector_combo.blockSignals(False)
             
         # Actualizar información de la planta
         self._update_plant_info()
@@ -4,7 +4,8 @@ from PyQt6.QtCore import pyqtSignal
 class ViewManager(QWidget):
     """
     Gestiona el área central de vistas principales (QStackedWidget + QComboBox).
-    Permite añadir vistas y seleccionar la activa.
+    Permite añadir vistas (o fábricas de vistas, construidas al seleccionarlas
+    por primera vez) y seleccionar la activa.
     Señal: view_changed(index: int)
     """
     view_changed = pyqtSignal(int)
@@ -14,15 +15,34 @@ class ViewManager(QWidget):
         layout = QVBoxLayout(self)
         self.combo = QComboBox()
         self.stack = QStackedWidget()
+        self._factories = {}  # índice -> fábrica de la vista aún no construida
         layout.addWidget(self.combo)
         layout.addWidget(self.stack)
-        self.combo.currentIndexChanged.connect(self.stack.setCurrentIndex)
+        self.combo.currentIndexChanged.connect(self._show_view)
         self.combo.currentIndexChanged.connect(self.view_changed.emit)
 
     def add_view(self, name, widget, data=None):
         self.combo.addItem(name, data)
         self.stack.addWidget(widget)
 
+    def add_view_factory(self, name, factory, data=None):
+        """Añade una vista que se construye con factory() al mostrarse por primera vez."""
+        self.combo.addItem(name, data)
+        index = self.stack.addWidget(QWidget())  # Marcador hasta construir la vista
+        self._factories[index] = factory
+        if self.combo.currentIndex() == index:
+            self._show_view(index)
+
+    def _show_view(self, index):
+        """Muestra la vista del índice dado, construyéndola si aún es una fábrica."""
+        factory = self._factories.pop(index, None)
+        if factory is not None:
+            placeholder = self.stack.widget(index)
+            self.stack.insertWidget(index, factory())
+            self.stack.removeWidget(placeholder)
+            placeholder.deleteLater()
+        self.stack.setCurrentIndex(index)
+
     def set_current_index(self, index):
         self.combo.setCurrentIndex(index)
 
@@ -4,6 +4,7 @@
 import logging
 import sys
 import os
+import importlib.util
 from PyQt6.QtWidgets import (
     QWidget, QVBoxLayout, QLabel, QPushButton, QGraphicsView, QGraphicsScene,
     QGraphicsEllipseItem, QGraphicsTextItem, QGraphicsPixmapItem, QMenu,
@@ -12,23 +13,18 @@ from PyQt6.QtWidgets import (
 from PyQt6.QtCore import Qt, QRectF, QPointF, pyqtSignal, pyqtSlot, QUrl
 from PyQt6.QtGui import QColor, QBrush, QPen, QFont, QPixmap, QPainter
 
-# Intentar importar módulos WebEngine para mapas
-WEB_ENGINE_AVAILABLE = False
-try:
-    from PyQt6.QtWebEngineWidgets import QWebEngineView
-    from PyQt6.QtWebChannel import QWebChannel
-    WEB_ENGINE_AVAILABLE = True
-except ImportError:
+# Comprobar (sin importarlos) los módulos opcionales para mapas. WebEngine y folium
+# son pesados, así que solo se importan cuando la vista GPS los necesita.
+WEB_ENGINE_AVAILABLE = (
+    importlib.util.find_spec("PyQt6.QtWebEngineWidgets") is not None
+    and importlib.util.find_spec("PyQt6.QtWebChannel") is not None
+)
+if not WEB_ENGINE_AVAILABLE:
     logging.warning("PyQt6.QtWebEngineWidgets no está disponible. Se utilizará una vista alternativa.")
     # Continuar sin WebEngine, usaremos una visualización alternativa
 
-# Intentar importar folium para mapas
-FOLIUM_AVAILABLE = False
-try:
-    import folium
-    import tempfile
-    FOLIUM_AVAILABLE = True
-except ImportError:
+FOLIUM_AVAILABLE = importlib.util.find_spec("folium") is not None
+if not FOLIUM_AVAILABLE:
     logging.warning("Folium no está disponible. Se utilizará una visualización alternativa.")
 
 import json
@@ -57,6 +53,7 @@ class GPSView(QWidget):
         layout = QVBoxLayout(self)
         
         if WEB_ENGINE_AVAILABLE and FOLIUM_AVAILABLE:
+            from PyQt6.QtWebEngineWidgets import QWebEngineView
             self.web_view = QWebEngineView()
             layout.addWidget(self.web_view)
         else:
@@ -136,6 +133,7 @@ class GPSView(QWidget):
     def _setup_channel(self):
         if not WEB_ENGINE_AVAILABLE or not FOLIUM_AVAILABLE or self.web_view is None:
             return
+        from PyQt6.QtWebChannel import QWebChannel
         self.channel = QWebChannel()
         self.channel.registerObject('gpsBridge', self)
         page = self.web_view.page() if self.web_view is not None else None
@@ -145,6 +143,8 @@ class GPSView(QWidget):
     def _load_map(self):
         if not WEB_ENGINE_AVAILABLE or not FOLIUM_AVAILABLE or self.web_view is None:
             return
+        import folium
+        import tempfile
         # Obtener nodos de la planta activa
         parent = self.parent()
         model = getattr(parent, 'model', None) if parent else None
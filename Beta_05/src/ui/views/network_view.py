@@ -696,7 +696,7 @@ class NetworkView(QGraphicsView):
             return
         
         # Obtener nodos del circuito
-        cts = self.model.DEFAULT_CIRCUITOS.get(circuit_id, [])
+        cts = self.model._plant_cfg().circuitos.get(circuit_id, [])
         
         if not cts:
             QMessageBox.warning(
@@ -757,9 +757,10 @@ class NetworkView(QGraphicsView):
             
             if segment_id and segment_data:
                 # Verificar estado de fibras de comunicación
-                fibers = segment_data.get('fibers', {})
-                ida_ok = self.model._check_segment_path_direction(fibers, self.model.DEFAULT_FIBRAS_COMMS_IDA)
-                vuelta_ok = self.model._check_segment_path_direction(fibers, self.model.DEFAULT_FIBRAS_COMMS_VUELTA)
+                ok_mask = segment_data.get('ok_mask', 0)
+                plant_cfg = self.model._plant_cfg()
+                ida_ok = self.model._check_segment_path_direction(ok_mask, plant_cfg.mask_ida)
+                vuelta_ok = self.model._check_segment_path_direction(ok_mask, plant_cfg.mask_vuelta)
                 
                 if ida_ok and vuelta_ok:
                     message += f"• {ct1} ↔ {ct2}: <span style='color: #16a34a;'>OK</span><br>"
@@ -789,9 +790,10 @@ class NetworkView(QGraphicsView):
             
             if segment_id and segment_data:
                 # Verificar estado de fibras de comunicación
-                fibers = segment_data.get('fibers', {})
-                ida_ok = self.model._check_segment_path_direction(fibers, self.model.DEFAULT_FIBRAS_COMMS_IDA)
-                vuelta_ok = self.model._check_segment_path_direction(fibers, self.model.DEFAULT_FIBRAS_COMMS_VUELTA)
+                ok_mask = segment_data.get('ok_mask', 0)
+                plant_cfg = self.model._plant_cfg()
+                ida_ok = self.model._check_segment_path_direction(ok_mask, plant_cfg.mask_ida)
+                vuelta_ok = self.model._check_segment_path_direction(ok_mask, plant_cfg.mask_vuelta)
                 
                 message += f"• SET ↔ {first_ct}: "
                 if ida_ok and vuelta_ok:
@@ -1,4 +1,4 @@
-from PyQt6.QtWidgets import QGroupBox, QVBoxLayout, QLabel, QTextEdit, QGraphicsScene
+from PyQt6.QtWidgets import QGroupBox, QVBoxLayout, QLabel, QTextEdit, QGraphicsScene, QGraphicsView
 from PyQt6.QtGui import QPainter
 from .zoomable_graphics_view import ZoomableGraphicsView
 
@@ -15,6 +15,7 @@ class RingStatusWidget(QGroupBox):
         self.ring_view_canvas = ZoomableGraphicsView()
         self.ring_view_canvas.setScene(QGraphicsScene())
         self.ring_view_canvas.setRenderHint(QPainter.RenderHint.Antialiasing)
+        self.ring_view_canvas.setViewportUpdateMode(QGraphicsView.ViewportUpdateMode.SmartViewportUpdate)
         self.ring_view_canvas.setMinimumHeight(250)
         layout.addWidget(self.ring_view_canvas)
         self.ring_view_text = QTextEdit()
@@ -6,6 +6,7 @@ import sys
 import unittest
 import tempfile
 import shutil
+import time
 
 # Ajustar path para importar desde src
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
@@ -90,6 +91,117 @@ class TestNetworkModel(unittest.TestCase):
         success, message = self.model.update_fiber_status('segmento_inexistente', 1, 'averiado')
         self.assertFalse(success)
     
+    def test_update_fiber_status_reversed_id(self):
+        """Verifica que un segmento se localiza también por su ID invertido."""
+        segment = self.model.get_segment_data()[0]
+        reversed_id = f"{segment['target']}-{segment['source']}"
+        
+        success, _ = self.model.update_fiber_status(reversed_id, 2, 'averiado')
+        self.assertTrue(success)
+        updated = next(s for s in self.model.get_segment_data() if s['id'] == segment['id'])
+        self.assertEqual(updated['fibers']['2'], 'averiado')
+    
+    def test_revision_tracks_changes(self):
+        """Verifica que la revisión del modelo solo avanza con cambios reales."""
+        segment_id = self.model.get_segment_data()[0]['id']
+        revision = self.model.revision
+        self.assertEqual(self.model.get_network_status()['revision'], revision)
+
+        self.model.update_fiber_status(segment_id, 1, 'averiado')
+        self.assertEqual(self.model.revision, revision + 1)
+
+        # Mismo estado: no hay cambio
+        self.model.update_fiber_status(segment_id, 1, 'averiado')
+        self.assertEqual(self.model.revision, revision + 1)
+
+        self.model.restore_segment_fibers(segment_id)
+        self.assertEqual(self.model.revision, revision + 2)
+
+    def test_fiber_history_pagination_same_timestamp(self):
+        """Verifica que paginar el historial no pierde filas de un lote con el mismo timestamp."""
+        plant_id = self.model.active_plant_id
+        events = [(plant_id, f"SEG{i}", 1, 'ok', 'averiado', None) for i in range(5)]
+        self.assertTrue(self.storage.log_fiber_status_changes(events))
+
+        rows = []
+        page = self.storage.get_fiber_status_history(plant_id=plant_id, limit=2)
+        while page:
+            rows.extend(page)
+            last = page[-1]
+            page = self.storage.get_fiber_status_history(
+                plant_id=plant_id, limit=2, before_ts=last['timestamp'], before_id=last['id'])
+
+        self.assertEqual(len({row['timestamp'] for row in rows}), 1)
+        self.assertEqual(sorted(row['segment_id'] for row in rows), [f"SEG{i}" for i in range(5)])
+        ids = [row['id'] for row in rows]
+        self.assertEqual(ids, sorted(ids, reverse=True))
+
+    def test_logical_patch_matches_rebuild(self):
+        """Verifica que parchear la caché de DG equivale a reconstruirlo."""
+        self.model.get_logical_graph()
+        segment_id = self.model.get_segment_data()[0]['id']
+        for fiber_num in range(1, 5):
+            self.model.update_fiber_status(segment_id, fiber_num, 'averiado')
+        self.assertTrue(self.model._cache_is_fresh())
+
+        patched = self.model.get_logical_graph()
+        rebuilt = self.model._build_directed_logical_graph_py()
+        self.assertEqual(set(patched.edges()), set(rebuilt.edges()))
+        adjacency = self.model._get_logical_adjacency()
+        self.assertEqual({(a, b) for a, nbrs in adjacency.succ.items() for b in nbrs},
+                         set(rebuilt.edges()))
+
+    def test_network_status_wide_segment(self):
+        """Verifica el estado de la red con un segmento de más de 63 fibras."""
+        graph_data = self.model._prepare_graph_data_for_save()
+        wide_edge = graph_data['edges'][0]
+        wide_edge['fibers']['64'] = 'ok'
+        self.model._init_graph(graph_data)
+
+        status = self.model.get_network_status()
+        self.assertEqual(len(status['segment_statuses']), len(graph_data['edges']))
+        self.assertEqual(len(status['ct_connectivity']), len(self.model._ct_list_cache))
+        wide = next(s for s in status['segment_statuses'] if s['id'] == wide_edge['id'])
+        self.assertEqual(wide['comm_status'], 'ok')
+
+        self.model.update_fiber_status(wide_edge['id'], 1, 'averiado')
+        status = self.model.get_network_status()
+        wide = next(s for s in status['segment_statuses'] if s['id'] == wide_edge['id'])
+        self.assertEqual(wide['comm_status'], 'faulty')
+
+    def test_segment_cache_tracks_comm_status(self):
+        """Verifica que la caché de segmentos mantiene 'comm_status' sin get_network_status."""
+        segment = self.model.get_segment_data()[0]
+        self.assertEqual(segment['comm_status'], 'ok')
+
+        self.model.update_fiber_status(segment['id'], 1, 'averiado')
+        self.assertEqual(segment['comm_status'], 'faulty')
+
+        self.model.restore_segment_fibers(segment['id'])
+        self.assertEqual(segment['comm_status'], 'ok')
+
+    def test_sparse_fibers_round_trip(self):
+        """Verifica que la numeración con huecos se conserva y los estados se normalizan."""
+        graph_data = self.model._prepare_graph_data_for_save()
+        edge = graph_data['edges'][0]
+        fibers = {str(i): 'ok' for i in range(1, 17)}
+        fibers.update({'17': 'averiado', '18': 'desconocido', '20': 'ok'})
+        edge['fibers'] = fibers
+        self.model._init_graph(graph_data)
+
+        saved = self.model._prepare_graph_data_for_save()
+        saved_edge = next(e for e in saved['edges'] if e['id'] == edge['id'])
+        self.assertNotIn('19', saved_edge['fibers'])
+        self.assertEqual(saved_edge['fibers'], {**fibers, '18': 'ok'})
+
+        # Una fibra ausente no se puede actualizar ni se crea al restaurar
+        success, _ = self.model.update_fiber_status(edge['id'], 19, 'averiado')
+        self.assertFalse(success)
+        self.model.restore_segment_fibers(edge['id'])
+        segment = next(s for s in self.model.get_segment_data() if s['id'] == edge['id'])
+        self.assertNotIn('19', segment['fibers'])
+        self.assertEqual(segment['fibers']['17'], 'ok')
+
     def test_get_network_status(self):
         """Verifica la obtención del estado completo de la red."""
         status = self.model.get_network_status()
@@ -128,6 +240,25 @@ class TestNetworkModel(unittest.TestCase):
             if segment:
                 self.assertEqual(segment['fibers']['1'], 'ok')
     
+    def test_pending_save_survives_plant_creation(self):
+        """Verifica que un guardado pendiente no queda bloqueado por el lote de set_active_plant."""
+        self.assertTrue(self.storage.delete_plant("Sabinar I"))
+        self.model._plants_cache = self.storage.get_plants()
+        save_config = self.storage.save_config
+
+        def slow_save_config(*args, **kwargs):
+            time.sleep(0.2)  # Sigue en cola cuando set_active_plant crea la planta
+            return save_config(*args, **kwargs)
+
+        self.storage.save_config = slow_save_config
+        self.model._graph_dirty = True
+        success, _ = self.model.save_configuration("pendiente")
+        self.assertTrue(success)
+
+        success, _ = self.model.set_active_plant("Sabinar I")
+        self.assertTrue(success)
+        self.assertIsNotNone(self.storage.load_config("pendiente", "default"))
+
     def test_logical_graph(self):
         """Verifica la construcción del grafo lógico."""
         # Obtener grafo lógico
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import os
+import sys
+import unittest
+import tempfile
+import shutil
+import base64
+import json
+import sqlite3
+import zlib
+
+# Ajustar path para importar desde src
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.model.storage import ConfigStorage, _CONFIG_ZDICT, _COMPRESS_MIN_BYTES, _config_json
+
+# Configuración de referencia y su BLOB tal y como lo guarda save_config (zlib con
+# el diccionario _CONFIG_ZDICT). Si deja de decodificarse, los BLOB ya guardados
+# en las bases de datos existentes tampoco se podrán leer.
+_FIBERS = {str(i): 'ok' for i in range(1, 17)}
+_FIXTURE_CONFIG = {
+    "nodes": [
+        {"id": "SET", "type": "set", "label": "SET"},
+        {"id": "CT01", "type": "ct", "circuit": "C1", "label": "CT01"},
+        {"id": "CT02", "type": "ct", "circuit": "C1", "label": "CT02"},
+    ],
+    "edges": [
+        {"source": "SET", "target": "CT01", "id": "SET-CT01", "circuit": "C1", "fibers": _FIBERS},
+        {"source": "CT01", "target": "CT02", "id": "CT01-CT02", "circuit": "C1",
+         "fibers": {**_FIBERS, "3": "averiado"}},
+    ],
+    "node_positions": {},
+    "timestamp": "2026-01-01T00:00:00",
+}
+_FIXTURE_BLOB = base64.b64decode(
+    "eD+HA60iIz0FkJ/WYIEFCifi0qiRUu1ogqNqgoMXQwOb7ICxilmKAVMFobIPABofsks="
+)
+_CONFIG_ZDICT_ADLER32 = 0x8703ad22
+
+class TestConfigStorageFormat(unittest.TestCase):
+    """Pruebas del formato en disco de las configuraciones."""
+
+    def setUp(self):
+        """Preparar entorno de prueba."""
+        self.test_dir = tempfile.mkdtemp()
+        self.db_path = os.path.join(self.test_dir, 'test_config.db')
+        self.storage = ConfigStorage(self.db_path)
+
+    def tearDown(self):
+        """Limpiar después de las pruebas."""
+        self.storage.close()
+        shutil.rmtree(self.test_dir)
+
+    def _insert_raw(self, name, data):
+        """Inserta una fila de configuraciones sin pasar por save_config."""
+        with sqlite3.connect(self.db_path) as conn:
+            conn.execute(
+                "INSERT INTO configurations (name, plant_id, data) VALUES (?, 'default', ?)",
+                (name, data)
+            )
+        conn.close()
+
+    def test_zdict_is_unchanged(self):
+        """El diccionario de zlib forma parte del formato: no puede cambiar."""
+        self.assertEqual(zlib.adler32(_CONFIG_ZDICT), _CONFIG_ZDICT_ADLER32)
+
+    def test_decode_compressed_fixture(self):
+        """Verifica que se lee un BLOB comprimido guardado por versiones anteriores."""
+        self.assertEqual(json.loads(_config_json(_FIXTURE_BLOB)), _FIXTURE_CONFIG)
+
+        self._insert_raw('fixture', _FIXTURE_BLOB)
+        self.assertEqual(self.storage.load_config('fixture'), _FIXTURE_CONFIG)
+
+    def test_round_trip_compressed(self):
+        """Verifica que una configuración grande se guarda comprimida y se recupera."""
+        config = dict(_FIXTURE_CONFIG, node_positions={f"CT{i:02d}": [i, i] for i in range(50)})
+        self.assertGreater(len(json.dumps(config)), _COMPRESS_MIN_BYTES)
+        self.assertTrue(self.storage.save_config('grande', config))
+
+        with sqlite3.connect(self.db_path) as conn:
+            stored = conn.execute("SELECT data FROM configurations WHERE name = 'grande'").fetchone()[0]
+        conn.close()
+        self.assertIsInstance(stored, bytes)
+        self.assertEqual(self.storage.load_config('grande'), config)
+
+    def test_read_legacy_text_row(self):
+        """Verifica que se leen las filas antiguas con el JSON como texto."""
+        self._insert_raw('legacy', json.dumps(_FIXTURE_CONFIG, indent=2))
+        self.assertEqual(self.storage.load_config('legacy'), _FIXTURE_CONFIG)
+
+if __name__ == '__main__':
+    unittest.main()